@@ -0,0 +1,235 @@
+"""End-to-end rerun latency, peak memory and payload of every page section, driven headlessly.
+
+For each scale a synthetic table (``benchmarks.synthetic``, same joint
+distribution as ``train_cleaned.csv``) is written to Parquet once, and
+``titanic_app.py`` is run under Streamlit's ``AppTest`` -- no browser, no
+server -- in a fresh interpreter pointed at it with ``TITANIC_DATA_PATH``
+and an empty ``TITANIC_CACHE_DIR``. Steps: the start-up run, every entry of
+``plot_options``, an estimator input change, and each export format (the
+deferred download callable is called directly, as a click would).
+
+Per step it reports the cold latency (first run), the warm latency (median
+of ``--repeat`` identical reruns), the peak RSS while the step ran (Linux
+resets the high-water mark per step; elsewhere it is the process peak so
+far) and the payload: serialized size of the rendered elements, or the
+file size for exports.
+
+    python -m benchmarks.bench_app --rows 1000 100000 1000000 10000000
+    python -m benchmarks.bench_app --rows 1000 100000 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_app --rows 1000 100000 --baseline benchmarks/baseline.json
+
+With ``--baseline`` the run exits non-zero when any step is slower, larger
+or uses more memory than the stored one by more than ``--tolerance``.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.synthetic import write_synthetic
+from titanic_data import CACHE_DIR
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+APP_PATH = REPO_DIR / "titanic_app.py"
+DATA_DIR = CACHE_DIR / "bench"
+
+METRICS = ('cold_ms', 'warm_ms', 'peak_mb', 'payload_bytes')
+# Timing differences below this are noise on any machine, whatever the ratio.
+MIN_REGRESSION_MS = 50
+
+
+# ---------------------- Measurement (worker) ----------------------
+def reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            return int(re.search(r'VmHWM:\s+(\d+) kB', f.read()).group(1)) / 1024
+    except (OSError, AttributeError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def payload_bytes(node):
+    """Serialized size of every element under ``node`` of an ``AppTest`` tree."""
+    size = 0
+    proto = getattr(node, 'proto', None)
+    if proto is not None and hasattr(proto, 'ByteSize'):
+        size += proto.ByteSize()
+    for child in getattr(node, 'children', {}).values():
+        size += payload_bytes(child)
+    return size
+
+
+def measure(step, cold, warm, repeat):
+    """Time ``cold()`` once and ``warm()`` ``repeat`` times; both return the payload size."""
+    reset_peak_rss()
+    start = time.perf_counter()
+    cold()
+    cold_ms = (time.perf_counter() - start) * 1000
+    warm_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = warm()
+        warm_times.append((time.perf_counter() - start) * 1000)
+    return {'step': step, 'cold_ms': cold_ms, 'warm_ms': statistics.median(warm_times),
+            'peak_mb': peak_rss_mb(), 'payload_bytes': size}
+
+
+def run_app(at):
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"app raised: {at.exception[0].message}")
+    return payload_bytes(at._tree)
+
+
+def run_steps(repeat, timeout):
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.testing.v1 import AppTest
+
+    from titanic_export import EXPORT_FORMATS
+    from titanic_viz import VISUALIZATIONS
+
+    # AppTest has no browser to click the download button; keep its deferred callables instead.
+    downloads = {}
+    add_deferred = MediaFileManager.add_deferred
+
+    def keep_deferred(self, data, *args, **kwargs):
+        file_id = add_deferred(self, data, *args, **kwargs)
+        downloads[file_id] = data
+        return file_id
+
+    def download():
+        return len(downloads[at.get('download_button')[0].proto.deferred_file_id]())
+
+    results = []
+    with mock.patch.object(MediaFileManager, 'add_deferred', keep_deferred):
+        at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+        results.append(measure('start-up', lambda: run_app(at), lambda: run_app(at), repeat))
+
+        plot_options = list(VISUALIZATIONS)
+        for label in plot_options:
+            def select_panel():
+                next(box for box in at.selectbox if box.options == plot_options).select(label)
+                return run_app(at)
+
+            results.append(measure(label, select_panel, lambda: run_app(at), repeat))
+
+        def change_estimator():
+            at.slider(key='age').set_value(45)
+            return run_app(at)
+
+        # The estimator is the last panel selected, so its inputs are on the page.
+        results.append(measure('estimator input', change_estimator, lambda: run_app(at), repeat))
+
+        for fmt in EXPORT_FORMATS:
+            at.selectbox(key='export_format').select(fmt)
+            run_app(at)
+            results.append(measure(f"export {fmt}", download, download, repeat))
+    return results
+
+
+# ---------------------- Driver ----------------------
+def dataset_path(n_rows, data_dir):
+    path = Path(data_dir) / f"passengers_{n_rows}.parquet"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        write_synthetic(tmp_path, n_rows)
+        os.replace(tmp_path, path)
+    return path
+
+
+def run_scale(n_rows, args):
+    """Run the steps for one scale in a fresh interpreter, so every scale starts cold."""
+    data_path = dataset_path(n_rows, args.data_dir)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        out_path = Path(cache_dir) / "results.json"
+        env = dict(os.environ, PYTHONPATH=str(REPO_DIR), TITANIC_DATA_PATH=str(data_path),
+                   TITANIC_CACHE_DIR=cache_dir, TITANIC_WARM_UP_VIEWS='0')
+        worker = subprocess.run([sys.executable, "-m", "benchmarks.bench_app", "--worker", str(out_path),
+                                 "--repeat", str(args.repeat), "--timeout", str(args.timeout)],
+                                cwd=REPO_DIR, env=env, capture_output=True, text=True)
+        if worker.returncode:
+            # Streamlit is chatty on stderr; the traceback is at the end.
+            sys.exit(f"❌ {n_rows:,} rows failed:\n" + "\n".join(worker.stderr.splitlines()[-20:]))
+        results = json.loads(out_path.read_text())
+    for result in results:
+        result['rows'] = n_rows
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """``(rows, step, metric, old, new)`` for every metric worse than the baseline by more than ``tolerance``."""
+    old_results = {(r['rows'], r['step']): r for r in baseline['results']}
+    worse = []
+    for result in results:
+        old = old_results.get((result['rows'], result['step']))
+        if old is None:
+            continue
+        for metric in METRICS:
+            limit = old[metric] * (1 + tolerance)
+            if metric.endswith('_ms'):
+                limit = max(limit, old[metric] + MIN_REGRESSION_MS)
+            if result[metric] > limit:
+                worse.append((result['rows'], result['step'], metric, old[metric], result[metric]))
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--data-dir', default=str(DATA_DIR))
+    parser.add_argument('--baseline', help="compare with this stored run and fail on regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--save-baseline', help="write this run as the new baseline")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        Path(args.worker).write_text(json.dumps(run_steps(args.repeat, args.timeout)))
+        return
+
+    results = []
+    print(f"{'rows':>10} {'step':<32} {'cold ms':>9} {'warm ms':>9} {'peak MB':>8} {'payload':>11}")
+    for n_rows in args.rows:
+        for result in run_scale(n_rows, args):
+            results.append(result)
+            print(f"{n_rows:>10,} {result['step']:<32} {result['cold_ms']:>9.1f} {result['warm_ms']:>9.1f} "
+                  f"{result['peak_mb']:>8.0f} {result['payload_bytes']:>11,}")
+
+    run = {'backend': os.environ.get("TITANIC_BACKEND", "pandas"), 'machine': platform.platform(),
+           'python': platform.python_version(), 'results': results}
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(run, indent=1) + "\n")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline.get('backend') != run['backend']:
+            sys.exit(f"❌ Baseline was recorded with the {baseline.get('backend')} backend, not {run['backend']}")
+        worse = regressions(results, baseline, args.tolerance)
+        for n_rows, step, metric, old, new in worse:
+            print(f"❌ {n_rows:,} rows, {step}: {metric} {old:,.1f} -> {new:,.1f}")
+        if worse:
+            sys.exit(1)
+        print(f"No regressions past {args.tolerance:.0%} of {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
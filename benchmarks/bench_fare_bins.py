@@ -0,0 +1,58 @@
+"""Fare binning: per-row ``Series.apply`` vs. the vectorized load-time kernel.
+
+    python -m benchmarks.bench_fare_bins --rows 1000 1000000 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from titanic_data import FARE_BIN_EDGES, bin_labels, binned
+
+
+def fare_bin(fare):
+    if fare <= 50: return "0–50"
+    elif fare <= 100: return "51–100"
+    elif fare <= 150: return "101–150"
+    else: return "151+"
+
+
+def apply_path(fares):
+    return pd.Categorical(fares.apply(fare_bin), categories=bin_labels(FARE_BIN_EDGES), ordered=True)
+
+
+def vectorized_path(fares):
+    return binned(fares.to_numpy(), FARE_BIN_EDGES)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    # TITANIC_FARE_BINS may ask for more bins than an int8 code holds.
+    fine_edges = tuple(range(2, 400, 2))
+    fares = np.arange(500, dtype=np.float32)
+    fine = binned(fares, fine_edges)
+    assert (fine.codes == np.searchsorted(fine_edges, fares)).all() and not fine.isna().any()
+
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>12} {'apply ms':>12} {'vectorized ms':>14} {'speedup':>9} {'bytes/row':>10}")
+    for n_rows in args.rows:
+        fares = pd.Series(rng.exponential(32.0, n_rows).astype(np.float32))
+        expected, slow = timed(apply_path, fares)
+        result, fast = timed(vectorized_path, fares)
+        assert (expected == result).all()
+        print(f"{n_rows:>12,} {slow * 1e3:>12.1f} {fast * 1e3:>14.2f} {slow / fast:>8.0f}x "
+              f"{result.codes.nbytes / n_rows:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
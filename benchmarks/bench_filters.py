@@ -0,0 +1,61 @@
+"""Sidebar filter latency: full boolean masks vs. the bitmap/sorted-permutation index.
+
+    python -m benchmarks.bench_filters --rows 1000 1000000 10000000
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import synthetic_passengers
+from titanic_data import SharedDataset, select_rows
+from titanic_index import FilterIndex, FilterState
+
+SCENARIOS = {
+    'defaults': FilterState.create(['female', 'male'], [1, 2, 3], ['C', 'Q', 'S'], (0, 80), (0, 512)),
+    'female': FilterState.create(['female'], [1, 2, 3], ['C', 'Q', 'S'], (0, 80), (0, 512)),
+    'age slider 30-32': FilterState.create(['female', 'male'], [1, 2, 3], ['C', 'Q', 'S'], (30, 32), (0, 512)),
+    'fare slider 200+': FilterState.create(['female', 'male'], [1, 2, 3], ['C', 'Q', 'S'], (0, 80), (200, 512)),
+    '1st class Q, family': FilterState.create(['female', 'male'], [1], ['Q'], (0, 80), (0, 512), True),
+}
+
+
+def mask_select(data, state):
+    mask = (
+        data.isin('Sex', state.sexes) &
+        data.isin('Pclass', state.pclasses) &
+        data.isin('Embarked', state.embarked) &
+        data.between('Age', *state.age_range) &
+        data.between('Fare', *state.fare_range)
+    )
+    if state.family_only:
+        mask &= (data.values('SibSp') > 0) | (data.values('Parch') > 0)
+    return select_rows(mask)
+
+
+def best_of(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'scenario':<22} {'masks ms':>10} {'index ms':>10} {'speedup':>8}")
+    for n_rows in args.rows:
+        data = SharedDataset(synthetic_passengers(n_rows))
+        start = time.perf_counter()
+        index = FilterIndex(data)
+        print(f"{n_rows:>12,} {'(index build)':<22} {'':>10} {(time.perf_counter() - start) * 1e3:>10.1f}")
+        for name, state in SCENARIOS.items():
+            masks = best_of(lambda: mask_select(data, state))
+            indexed = best_of(lambda: index.select(state))
+            print(f"{n_rows:>12,} {name:<22} {masks * 1e3:>10.2f} {indexed * 1e3:>10.2f} {masks / indexed:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
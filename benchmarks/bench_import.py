@@ -0,0 +1,81 @@
+"""Cold-start import time of the app's modules, and what each visualization adds on first selection.
+
+Every measurement runs in a fresh interpreter under ``python -X importtime``
+so nothing is already in ``sys.modules``; the cumulative time of each
+top-level import is summed. The "eager" row adds every plotting library the
+registry declares, which is what the app imported at start-up before the
+panels were loaded lazily.
+
+    python -m benchmarks.bench_import --repeat 5
+"""
+import argparse
+import ast
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+APP_PATH = REPO_DIR / "titanic_app.py"
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def app_modules(path=APP_PATH):
+    """Modules ``titanic_app.py`` imports at the top level, in order."""
+    modules = []
+    for node in ast.parse(path.read_text(encoding='utf-8')).body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return tuple(dict.fromkeys(modules))
+
+
+def import_seconds(modules, preloaded=()):
+    """Cumulative import time of ``modules`` in a fresh interpreter, after ``preloaded`` is imported."""
+    code = "".join(f"import {name}\n" for name in preloaded)
+    code += "import sys; sys.stderr.write('--- measure ---\\n')\n"
+    code += "".join(f"import {name}\n" for name in modules)
+    env = dict(os.environ, PYTHONPATH=str(REPO_DIR))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_DIR,
+                            env=env, capture_output=True, text=True, check=True)
+    stderr = result.stderr.split('--- measure ---\n', 1)[1]
+    total_us = 0
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # Top-level entries have a single space of indentation; nested ones are already counted.
+        if match and len(match.group(3)) == 1:
+            total_us += int(match.group(2))
+    return total_us / 1e6
+
+
+def median_seconds(modules, preloaded=(), repeat=3):
+    return statistics.median(import_seconds(modules, preloaded) for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(REPO_DIR))
+    from titanic_viz import VISUALIZATIONS
+
+    modules = app_modules()
+    declared = sorted({name for viz in VISUALIZATIONS.values() for name in viz.requires})
+    lazy = median_seconds(modules, repeat=args.repeat)
+    eager = median_seconds(modules + tuple(declared), repeat=args.repeat)
+    print(f"{'app start (lazy panels)':<40} {lazy * 1000:>9.1f} ms")
+    print(f"{'app start (eager plotting imports)':<40} {eager * 1000:>9.1f} ms")
+    print()
+    print(f"{'first selection of':<40} {'extra import':>12}")
+    for label, viz in VISUALIZATIONS.items():
+        extra = median_seconds(viz.requires, preloaded=modules, repeat=args.repeat) if viz.requires else 0.0
+        print(f"{label:<40} {extra * 1000:>9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Upload ingestion: block-wise Arrow parsing into Parquet vs. ``load_dataset`` on the CSV.
+
+Writes a synthetic CSV with blank Sex, Age and Embarked cells, ingests it
+as an upload would be and checks that loading the ingested Parquet file
+gives the same frame (missing values included) as loading the CSV itself.
+
+    python -m benchmarks.bench_ingest --rows 1000 1000000 10000000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_passengers
+from titanic_data import cache_path_for, load_dataset
+from titanic_ingest import INGEST_BLOCK_BYTES, ingest_csv
+from titanic_stats import stats_path_for
+
+# Share of the text and Age cells left blank.
+BLANK_SHARE = 0.05
+
+
+def write_csv(path, n_rows, seed=0):
+    df = synthetic_passengers(n_rows, seed=seed)
+    rng = np.random.default_rng(seed)
+    for name in ('Sex', 'Age', 'Embarked'):
+        df[name] = df[name].astype(object).where(rng.random(n_rows) >= BLANK_SHARE)
+    df.to_csv(path, index=False)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 1_000_000])
+    parser.add_argument('--block-bytes', type=int, default=INGEST_BLOCK_BYTES)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'read_csv ms':>12} {'ingest ms':>10} {'MB/s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            csv_path, parquet_path = Path(tmp, f"{n_rows}.csv"), Path(tmp, f"{n_rows}.parquet")
+            write_csv(csv_path, n_rows)
+            data = csv_path.read_bytes()
+            try:
+                expected, slow = timed(load_dataset, csv_path)
+                _, fast = timed(ingest_csv, data, parquet_path, None, 'pandas', args.block_bytes)
+                pd.testing.assert_frame_equal(load_dataset(parquet_path), expected)
+            finally:
+                # Both loaders keep their caches next to the app's.
+                cache_path_for(csv_path).unlink(missing_ok=True)
+                stats_path_for(parquet_path, 'pandas').unlink(missing_ok=True)
+            print(f"{n_rows:>12,} {slow * 1e3:>12.1f} {fast * 1e3:>10.1f} {len(data) / fast / 1e6:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""Concurrent-session load test: rerun latency percentiles, server RSS per session and CPU.
+
+Starts ``streamlit run titanic_app.py`` on localhost and connects N
+simulated browsers over the app's websocket (``/_stcore/stream``), speaking
+the same BackMsg/ForwardMsg protocol as the real frontend. Every session
+loads the page, then repeatedly, with a random think time in between:
+
+* edits a sidebar filter and presses "Apply filters" (full rerun),
+* switches the visualization selector (rerun of that section only),
+* drags an estimator slider (rerun of the estimator only).
+
+Latency is measured from sending the rerun to the server's
+``script_finished``. While sessions run, the server process is sampled for
+RSS and CPU (Linux ``/proc``); per-session RSS is the growth over the idle
+server divided by the session count. Each ``--sessions`` level runs against
+the same server, so later levels see the caches earlier ones filled.
+
+    python -m benchmarks.bench_load --sessions 1 5 10 25 --actions 20
+    python -m benchmarks.bench_load --rows 1000000 --sessions 10 --think 0.5
+    TITANIC_BACKEND=duckdb python -m benchmarks.bench_load --rows 10000000 --sessions 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from websockets.asyncio.client import connect
+
+from benchmarks.bench_app import dataset_path
+from titanic_data import CACHE_DIR
+from titanic_viz import VISUALIZATIONS
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+APP_PATH = REPO_DIR / "titanic_app.py"
+DATA_DIR = CACHE_DIR / "bench"
+
+ESTIMATOR = "🧮 Survival Probability"
+# Relative frequency of each interaction in a session.
+ACTIONS = {'filter': 3, 'plot': 4, 'estimator': 3}
+# WidgetState field each widget type sends its value in.
+VALUE_FIELDS = {'multiselect': 'string_array_value', 'selectbox': 'string_value',
+                'slider': 'double_array_value', 'checkbox': 'bool_value'}
+
+
+# ---------------------- Simulated Browser ----------------------
+class Session:
+    """One browser tab: holds the widgets last rendered and the values it has set on them."""
+
+    def __init__(self, url):
+        self.url = url
+        self.widgets = {}
+        self.values = {}
+        # Fragment id -> the fragment it was first rendered in, to know what a fragment rerun replaces.
+        self.parents = {}
+
+    async def __aenter__(self):
+        self.ws = await connect(self.url, subprotocols=['streamlit'], max_size=None)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.ws.close()
+
+    def find(self, kind, label=None, options=None):
+        for widget_kind, proto, fragment_id in self.widgets.values():
+            if widget_kind == kind and (label is None or proto.label == label) \
+                    and (options is None or list(proto.options) == options):
+                return proto, fragment_id
+        return None, None
+
+    def _collect(self, msg, fragment_id, seen):
+        if not msg.HasField('delta') or not msg.delta.HasField('new_element'):
+            return
+        if msg.delta.fragment_id != fragment_id:
+            self.parents.setdefault(msg.delta.fragment_id, fragment_id)
+        element = msg.delta.new_element
+        kind = element.WhichOneof('type')
+        if kind in VALUE_FIELDS or kind == 'button':
+            proto = getattr(element, kind)
+            self.widgets[proto.id] = (kind, proto, msg.delta.fragment_id)
+            seen.add(proto.id)
+
+    def _within(self, widget_fragment, fragment_id):
+        while widget_fragment:
+            if widget_fragment == fragment_id:
+                return True
+            widget_fragment = self.parents.get(widget_fragment, '')
+        return not fragment_id
+
+    def _prune(self, fragment_id, seen):
+        """Forget widgets the rerun replaced but did not draw again (e.g. another panel's inputs)."""
+        for widget_id, (_, _, widget_fragment) in list(self.widgets.items()):
+            if widget_id not in seen and self._within(widget_fragment, fragment_id):
+                del self.widgets[widget_id]
+
+    async def rerun(self, changes=None, trigger=None, fragment_id=''):
+        """Send a rerun with ``changes`` (widget id -> value) applied; returns seconds until it finished."""
+        self.values.update(changes or {})
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.fragment_id = fragment_id
+        for widget_id, value in self.values.items():
+            if widget_id not in self.widgets:
+                continue
+            widget = state.widget_states.widgets.add(id=widget_id)
+            field = VALUE_FIELDS[self.widgets[widget_id][0]]
+            if field.endswith('_array_value'):
+                getattr(widget, field).data.extend(value)
+            else:
+                setattr(widget, field, value)
+        if trigger is not None:
+            state.widget_states.widgets.add(id=trigger, trigger_value=True)
+
+        seen = set()
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            reply = ForwardMsg()
+            reply.ParseFromString(await self.ws.recv())
+            self._collect(reply, fragment_id, seen)
+            if reply.WhichOneof('type') == 'script_finished':
+                if reply.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("app failed to compile")
+                if reply.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    elapsed = time.perf_counter() - start
+                    self._prune(fragment_id, seen)
+                    return elapsed
+
+
+# ---------------------- Interaction Scripts ----------------------
+async def change_filter(session, rng):
+    if rng.random() < 0.5:
+        proto, _ = session.find('multiselect', label="Passenger Class")
+        options = list(proto.options)
+        value = sorted(rng.sample(options, rng.randint(1, len(options))))
+    else:
+        proto, _ = session.find('slider', label="Age Range")
+        low = rng.uniform(proto.min, proto.max / 2)
+        value = [round(low), round(rng.uniform(low + 5, proto.max))]
+    submit = next(widget_id for widget_id, (kind, widget, _) in session.widgets.items()
+                  if kind == 'button' and widget.is_form_submitter)
+    return await session.rerun({proto.id: value}, trigger=submit)
+
+
+async def switch_plot(session, rng, label=None):
+    options = list(VISUALIZATIONS)
+    proto, fragment_id = session.find('selectbox', options=options)
+    return await session.rerun({proto.id: label or rng.choice(options)}, fragment_id=fragment_id)
+
+
+async def drag_estimator(session, rng):
+    proto, fragment_id = session.find('slider', label="Age")
+    if proto is None:
+        # Not on the estimator yet: going there is the interaction.
+        return await switch_plot(session, rng, ESTIMATOR)
+    return await session.rerun({proto.id: [rng.randint(1, 80)]}, fragment_id=fragment_id)
+
+
+SCRIPTS = {'filter': change_filter, 'plot': switch_plot, 'estimator': drag_estimator}
+
+
+async def run_session(url, n_actions, think, seed, latencies):
+    rng = random.Random(seed)
+    async with Session(url) as session:
+        latencies.append(('load', await session.rerun()))
+        for _ in range(n_actions):
+            await asyncio.sleep(rng.expovariate(1 / think) if think else 0)
+            action = rng.choices(list(ACTIONS), weights=list(ACTIONS.values()))[0]
+            latencies.append((action, await SCRIPTS[action](session, rng)))
+
+
+# ---------------------- Server ----------------------
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, env, log):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", str(APP_PATH), "--server.headless", "true",
+         "--server.port", str(port), "--server.address", "127.0.0.1",
+         "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none"],
+        cwd=REPO_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            break
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("streamlit server did not come up")
+
+
+class ServerSampler:
+    """Samples RSS and CPU time of a process from ``/proc`` (zeros where that does not exist)."""
+
+    TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+    def __init__(self, pid, interval=0.25):
+        self.pid = pid
+        self.interval = interval
+        self.rss = []
+        self.cpu = []
+
+    def rss_mb(self):
+        try:
+            with open(f'/proc/{self.pid}/status') as f:
+                line = next(line for line in f if line.startswith('VmRSS:'))
+            return int(line.split()[1]) / 1024
+        except (OSError, StopIteration):
+            return 0.0
+
+    def cpu_seconds(self):
+        try:
+            with open(f'/proc/{self.pid}/stat') as f:
+                # Fields after the parenthesised command name; utime and stime are 14th and 15th.
+                fields = f.read().rsplit(')', 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / self.TICKS
+        except (OSError, IndexError):
+            return 0.0
+
+    async def run(self):
+        last_cpu, last_time = self.cpu_seconds(), time.perf_counter()
+        while True:
+            await asyncio.sleep(self.interval)
+            cpu, now = self.cpu_seconds(), time.perf_counter()
+            # Percent of all cores, so 100% is a saturated machine.
+            self.cpu.append((cpu - last_cpu) / (now - last_time) / os.cpu_count() * 100)
+            self.rss.append(self.rss_mb())
+            last_cpu, last_time = cpu, now
+
+
+async def load_level(url, pid, n_sessions, n_actions, think, seed):
+    sampler = ServerSampler(pid)
+    idle_rss = sampler.rss_mb()
+    sampling = asyncio.create_task(sampler.run())
+    latencies = []
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(run_session(url, n_actions, think, seed + i, latencies)
+                               for i in range(n_sessions)))
+    finally:
+        sampling.cancel()
+    return {'sessions': n_sessions, 'seconds': time.perf_counter() - start, 'latencies': latencies,
+            'idle_rss': idle_rss, 'peak_rss': max(sampler.rss, default=idle_rss),
+            'cpu_mean': float(np.mean(sampler.cpu)) if sampler.cpu else 0.0,
+            'cpu_max': max(sampler.cpu, default=0.0)}
+
+
+def print_level(level):
+    print(f"\n{level['sessions']} sessions, {len(level['latencies'])} reruns in {level['seconds']:.1f} s · "
+          f"server RSS {level['idle_rss']:.0f} -> {level['peak_rss']:.0f} MB "
+          f"({(level['peak_rss'] - level['idle_rss']) / level['sessions']:.1f} MB/session) · "
+          f"CPU mean {level['cpu_mean']:.0f}% max {level['cpu_max']:.0f}% of {os.cpu_count()} cores")
+    print(f"{'action':<10} {'reruns':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for action in ['load', *ACTIONS, 'all']:
+        seconds = [s for name, s in level['latencies'] if action in (name, 'all')]
+        if seconds:
+            p50, p95, p99 = np.percentile(np.array(seconds) * 1000, [50, 95, 99])
+            print(f"{action:<10} {len(seconds):>7} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 5, 10, 25])
+    parser.add_argument('--actions', type=int, default=20, help="interactions per session after the page load")
+    parser.add_argument('--think', type=float, default=1.0, help="mean seconds between a session's interactions")
+    parser.add_argument('--rows', type=int, help="serve a synthetic table of this many rows instead of the app's data")
+    parser.add_argument('--data-dir', default=str(DATA_DIR))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.rows:
+        env['TITANIC_DATA_PATH'] = str(dataset_path(args.rows, args.data_dir))
+    port = free_port()
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    with tempfile.TemporaryFile() as log:
+        server = start_server(port, env, log)
+        try:
+            # One session first, so the levels measure serving rather than the data load.
+            asyncio.run(load_level(url, server.pid, 1, 0, 0, args.seed))
+            for n_sessions in args.sessions:
+                print_level(asyncio.run(load_level(url, server.pid, n_sessions, args.actions, args.think, args.seed)))
+        except Exception:
+            log.seek(0)
+            sys.stderr.write(log.read().decode(errors='replace')[-4000:])
+            raise
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
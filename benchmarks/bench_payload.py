@@ -0,0 +1,66 @@
+"""Figure payload bytes: raw-row Plotly charts vs. server-side histograms and counts.
+
+Builds the "Age Distribution by Survival" histogram and the two
+"Passenger Demographics" pies both ways and reports ``len(fig.to_json())``.
+
+    python -m benchmarks.bench_payload --rows 1000 100000 1000000
+"""
+import argparse
+
+import plotly.express as px
+
+from benchmarks.synthetic import synthetic_passengers
+from titanic_charts import age_histogram
+from titanic_cube import SurvivalCube
+from titanic_data import SharedDataset, add_bins
+from titanic_index import FilterState
+
+SURVIVAL_COLORS = {0: '#ff7675', 1: '#55efc4'}
+GENDER_COLORS = {'male': '#74b9ff', 'female': '#fd79a8'}
+CLASS_COLORS = {1: '#a29bfe', 2: '#74b9ff', 3: '#55efc4'}
+
+
+def raw_figures(df):
+    return {
+        'age histogram': px.histogram(df, x='Age', color='Survived', nbins=20,
+                                      facet_col='Sex', barmode='overlay',
+                                      color_discrete_map=SURVIVAL_COLORS, opacity=0.8),
+        'gender pie': px.pie(df, names='Sex'),
+        'class pie': px.pie(df, names='Pclass'),
+    }
+
+
+def binned_figures(data, summary):
+    hist, edges = age_histogram(data, None)
+    histogram = px.bar(hist, x='Age', y='count', color='Survived', facet_col='Sex', barmode='overlay',
+                       color_discrete_map={str(k): v for k, v in SURVIVAL_COLORS.items()}, opacity=0.8)
+    histogram.update_traces(width=float(edges[1] - edges[0]))
+    return {
+        'age histogram': histogram,
+        'gender pie': px.pie(summary.counts_by('Sex'), names='Sex', values='count',
+                             color='Sex', color_discrete_map=GENDER_COLORS),
+        'class pie': px.pie(summary.counts_by('Pclass'), names='Pclass', values='count',
+                            color='Pclass', color_discrete_map=CLASS_COLORS),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'chart':<15} {'raw bytes':>12} {'binned bytes':>13}")
+    for n_rows in args.rows:
+        df = add_bins(synthetic_passengers(n_rows))
+        data = SharedDataset(df)
+        summary = SurvivalCube(data).query(FilterState.create(
+            data.categories('Sex'), data.categories('Pclass'), data.categories('Embarked'),
+            (0, 1000), (0, 10000)))
+        raw = raw_figures(df)
+        binned = binned_figures(data, summary)
+        for name in raw:
+            print(f"{n_rows:>10,} {name:<15} {len(raw[name].to_json()):>12,} {len(binned[name].to_json()):>13,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Per-session memory: per-session DataFrame copies vs. the shared dataset.
+
+Simulates sessions the way the app used to hold them (an ``st.cache_data``
+copy, a filtered copy and an added ``Fare_Bin`` column) and the way it does
+now (one ``SharedDataset`` plus a selection vector per session), and reports
+traced memory as sessions are added.
+
+    python -m benchmarks.bench_shared_memory --rows 1000000 --sessions 1 2 4 8 16
+"""
+import argparse
+import gc
+import pickle
+import tracemalloc
+
+
+from benchmarks.synthetic import synthetic_passengers
+from titanic_data import SharedDataset, select_rows
+
+FILTERS = [
+    {'Sex': ['female', 'male'], 'Pclass': [1, 2, 3]},
+    {'Sex': ['female'], 'Pclass': [1, 2, 3]},
+    {'Sex': ['male'], 'Pclass': [1, 2]},
+    {'Sex': ['female', 'male'], 'Pclass': [3]},
+]
+
+
+def fare_bin(fare):
+    if fare <= 50: return "0–50"
+    elif fare <= 100: return "51–100"
+    elif fare <= 150: return "101–150"
+    else: return "151+"
+
+
+def copy_session(df, filters):
+    df = pickle.loads(pickle.dumps(df))
+    df = df[df['Sex'].isin(filters['Sex']) & df['Pclass'].isin(filters['Pclass'])]
+    df['Fare_Bin'] = df['Fare'].apply(fare_bin)
+    return df
+
+
+def shared_session(data, filters):
+    return select_rows(data.isin('Sex', filters['Sex']) & data.isin('Pclass', filters['Pclass']))
+
+
+def measure(make_session, counts):
+    sessions = []
+    results = []
+    gc.collect()
+    start = tracemalloc.get_traced_memory()[0]
+    for count in counts:
+        while len(sessions) < count:
+            sessions.append(make_session(FILTERS[len(sessions) % len(FILTERS)]))
+        gc.collect()
+        results.append(tracemalloc.get_traced_memory()[0] - start)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    df = synthetic_passengers(args.rows)
+    tracemalloc.start()
+
+    copies = measure(lambda f: copy_session(df, f), args.sessions)
+
+    gc.collect()
+    base = tracemalloc.get_traced_memory()[0]
+    data = SharedDataset(df)
+    shared_bytes = tracemalloc.get_traced_memory()[0] - base
+    shared = measure(lambda f: shared_session(data, f), args.sessions)
+    tracemalloc.stop()
+
+    mb = 1024 ** 2
+    print(f"rows={args.rows:,}  shared dataset={shared_bytes / mb:.1f} MB (held once per process)")
+    print(f"{'sessions':>8} {'copies MB':>10} {'per session':>12} {'shared MB':>10} {'per session':>12}")
+    for count, old, new in zip(args.sessions, copies, shared):
+        print(f"{count:>8} {old / mb:>10.1f} {old / count / mb:>10.2f}MB "
+              f"{new / mb:>10.2f} {new / count / mb:>10.2f}MB")
+
+
+if __name__ == '__main__':
+    main()
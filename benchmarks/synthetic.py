@@ -0,0 +1,59 @@
+"""Synthetic passenger tables for benchmarks.
+
+Rows are resampled with replacement from ``train_cleaned.csv`` so the joint
+distribution of every column is preserved; Age and Fare get a little jitter
+so the scaled-up table does not consist of exact duplicates.
+
+Write a large table to Parquet chunk by chunk (memory stays bounded by the
+chunk size), e.g. for ``TITANIC_BACKEND=duckdb TITANIC_DATA_PATH=...``:
+
+    python -m benchmarks.synthetic --rows 100000000 --out passengers_100m.parquet
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from titanic_data import DATA_PATH, optimize_dtypes
+
+
+def synthetic_passengers(n_rows, seed=0, source=DATA_PATH):
+    base = pd.read_csv(source)
+    rng = np.random.default_rng(seed)
+    df = base.iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True)
+    df['Age'] = (df['Age'] + rng.uniform(-0.5, 0.5, n_rows)).clip(lower=0.1).round(2)
+    df['Fare'] = (df['Fare'] * rng.uniform(0.98, 1.02, n_rows)).round(4)
+    return optimize_dtypes(df)
+
+
+def write_synthetic(path, n_rows, chunk_rows=5_000_000, seed=0, source=DATA_PATH):
+    """Write ``n_rows`` synthetic passengers to a Parquet file, one row group per chunk."""
+    writer = None
+    try:
+        for i, start in enumerate(range(0, n_rows, chunk_rows)):
+            chunk = synthetic_passengers(min(chunk_rows, n_rows - start), seed=seed + i, source=source)
+            # Plain columns, so every chunk has the same schema whatever values it happened to draw.
+            chunk = chunk.astype({name: object for name, col in chunk.items() if isinstance(col.dtype, pd.CategoricalDtype)})
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic passenger table to Parquet.")
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--chunk-rows', type=int, default=5_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_synthetic(args.out, args.rows, args.chunk_rows, args.seed)
+
+
+if __name__ == '__main__':
+    main()
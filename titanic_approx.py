@@ -0,0 +1,230 @@
+"""Approximate answers from a stratified sample, while the exact ones are computed.
+
+On a large table a scan-bound backend (DuckDB over Parquet) can take longer
+than a rerun should. Each dataset version gets a sample of about
+``APPROX_SAMPLE_ROWS`` rows drawn within every Sex x Pclass x Survived
+group: groups get rows in proportion to their size, but never fewer than
+``MIN_STRATUM_ROWS``, so the small groups that filters isolate are still
+well covered. Every sampled row stands for ``N_h / n_h`` passengers of its
+group.
+
+``SampleView`` answers what a backend view answers (metric values, grouped
+rates and counts, histograms, the density grid, the correlation matrix)
+from the sample, with standard errors from the stratified-sampling
+variance (ratio estimates are linearized), so the metric cards can show
+95% confidence intervals. A page section waits for its exact result up to
+the latency budget and only then shows the estimate, provided its
+survival-rate interval is within the error budget; the exact work goes on
+in the background and the page reruns when it is done.
+
+``TITANIC_LATENCY_BUDGET_MS`` and ``TITANIC_ERROR_BUDGET`` set the defaults
+of the sidebar settings; a budget of 0 always waits for the exact answer.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import wait
+
+import numpy as np
+
+from titanic_charts import age_histogram, density_grid
+from titanic_cube import CORRELATION_COLUMNS, correlation_from_moments
+from titanic_data import SharedDataset
+from titanic_index import FilterIndex
+
+
+APPROX_SAMPLE_ROWS = int(os.environ.get("TITANIC_APPROX_SAMPLE_ROWS", 200_000))
+MIN_STRATUM_ROWS = int(os.environ.get("TITANIC_APPROX_MIN_STRATUM_ROWS", 2_000))
+LATENCY_BUDGET_MS = float(os.environ.get("TITANIC_LATENCY_BUDGET_MS", 500))
+# Widest acceptable 95% interval on the survival rate, as +/- a share (0.02 = 2 points).
+ERROR_BUDGET = float(os.environ.get("TITANIC_ERROR_BUDGET", 0.02))
+
+SAMPLE_STRATA = ('Sex', 'Pclass', 'Survived')
+# Normal quantile of a two-sided 95% interval.
+Z_95 = 1.959964
+
+logger = logging.getLogger(__name__)
+
+
+def stratum_sizes(counts, max_rows=APPROX_SAMPLE_ROWS, min_rows=MIN_STRATUM_ROWS):
+    """Rows to draw from groups of ``counts`` rows: proportional, at least ``min_rows``, at most the group."""
+    counts = np.asarray(counts, dtype=np.int64)
+    sizes = np.maximum(np.round(max_rows * counts / max(int(counts.sum()), 1)), min_rows)
+    return np.minimum(sizes, counts).astype(np.int64)
+
+
+def finished_within(future, seconds):
+    """Wait up to ``seconds`` for ``future``; whether it is done."""
+    return bool(wait([future], timeout=max(0.0, seconds)).done)
+
+
+# ---------------------- Sample ----------------------
+class StratifiedSample:
+    """Sampled rows with their filter index, stratum of each row and the strata sizes."""
+
+    def __init__(self, frame, population):
+        self.data = SharedDataset(frame)
+        self.index = FilterIndex(self.data)
+        self.n_rows = len(frame)
+        self.strata = frame.groupby(list(SAMPLE_STRATA), observed=True, dropna=False, sort=False).ngroup().to_numpy()
+        self.sampled = np.bincount(self.strata).astype(np.float64)
+        self.population = np.zeros(len(self.sampled))
+        self.population[self.strata] = population
+        self.weights = (self.population / self.sampled)[self.strata]
+
+    def total(self, values):
+        """Estimated table-wide sum of ``values`` (one per sampled row) and its variance."""
+        sums = np.bincount(self.strata, weights=values, minlength=len(self.sampled))
+        squares = np.bincount(self.strata, weights=values * values, minlength=len(self.sampled))
+        n, N = self.sampled, self.population
+        with np.errstate(invalid='ignore', divide='ignore'):
+            spread = np.where(n > 1, (squares - sums ** 2 / n) / (n - 1), 0.0)
+            # Strata drawn in full (n == N) add no variance.
+            variance = np.sum(N ** 2 * (1 - n / N) * spread / n)
+        return float(np.sum(N / n * sums)), max(float(variance), 0.0)
+
+
+class Approximator:
+    """The stratified sample of one backend version, drawn in the background, and views over it."""
+
+    def __init__(self, backend, max_rows=APPROX_SAMPLE_ROWS):
+        self.backend = backend
+        self.sample = None
+        if backend.n_rows > max_rows:
+            # Smaller tables are answered exactly faster than a sample could be.
+            threading.Thread(target=self._draw, args=(max_rows,), name="titanic-sample", daemon=True).start()
+
+    def _draw(self, max_rows):
+        try:
+            self.sample = StratifiedSample(*self.backend.stratified_sample(max_rows))
+        except Exception:
+            logger.exception("could not draw the approximation sample; results stay exact")
+
+    def view(self, filters, exact, error_budget=ERROR_BUDGET):
+        """A ``SampleView`` of ``filters`` (``exact`` being the backend's view of them), or ``None``
+        when there is no sample yet or its survival-rate interval is wider than ``error_budget``."""
+        if self.sample is None:
+            return None
+        estimate = SampleView(self.sample, filters, exact)
+        low, high = estimate.interval('survival_rate')
+        if not high - low <= 2 * error_budget:
+            return None
+        return estimate
+
+
+# ---------------------- Estimates ----------------------
+class SampleView:
+    """Estimates for the filtered passengers from the sample; exports go to the ``exact`` view."""
+
+    def __init__(self, sample, filters, exact):
+        self.stratified = sample
+        self.filters = filters
+        self.exact = exact
+        self.backend = exact.backend
+        self.selection = sample.index.select(filters)
+        self._domain = np.zeros(sample.n_rows)
+        self._domain[slice(None) if self.selection is None else self.selection] = 1.0
+        self._estimates = {}
+
+    @property
+    def sampled_rows(self):
+        """Sampled rows the estimates rest on."""
+        return self.stratified.n_rows if self.selection is None else len(self.selection)
+
+    def _estimate(self, name):
+        """``(estimate, standard error)`` of the count or of a column mean over the filtered rows."""
+        if name not in self._estimates:
+            if name == 'count':
+                total, variance = self.stratified.total(self._domain)
+                self._estimates[name] = (total, np.sqrt(variance))
+            else:
+                values = self.stratified.data.values(name).astype(np.float64)
+                present = self._domain * ~np.isnan(values)
+                values = np.where(present > 0, values, 0.0)
+                rows, _ = self.stratified.total(present)
+                if not rows:
+                    self._estimates[name] = (float('nan'), float('nan'))
+                else:
+                    ratio = self.stratified.total(values)[0] / rows
+                    # Linearized variance of the ratio estimate.
+                    _, variance = self.stratified.total(values - ratio * present)
+                    self._estimates[name] = (ratio, np.sqrt(variance) / rows)
+        return self._estimates[name]
+
+    def interval(self, measure):
+        """95% confidence interval of ``count``, ``survival_rate``, ``mean_age`` or ``mean_fare``."""
+        name = {'count': 'count', 'survival_rate': 'Survived', 'mean_age': 'Age', 'mean_fare': 'Fare'}[measure]
+        estimate, error = self._estimate(name)
+        return estimate - Z_95 * error, estimate + Z_95 * error
+
+    @property
+    def count(self):
+        return int(round(self._estimate('count')[0]))
+
+    @property
+    def survival_rate(self):
+        return self._estimate('Survived')[0]
+
+    @property
+    def mean_age(self):
+        return self._estimate('Age')[0]
+
+    @property
+    def mean_fare(self):
+        return self._estimate('Fare')[0]
+
+    def _weighted(self, names):
+        frame = self.stratified.data.view(self.selection, list(names) + ['Survived'])
+        frame['weight'] = self.stratified.weights if self.selection is None else self.stratified.weights[self.selection]
+        frame['survived'] = frame['weight'] * frame['Survived']
+        return frame.groupby(list(names), observed=True)[['weight', 'survived']].sum().reset_index()
+
+    def survival_by(self, *names):
+        frame = self._weighted(names)
+        frame['Survived'] = frame['survived'] / frame['weight']
+        return frame[list(names) + ['Survived']]
+
+    def survival_counts(self, *names):
+        """Sampled rows per group as ``count`` and the estimated rate times that as ``survived``: the
+        precision of an estimated rate rests on the rows sampled, not on the passengers they stand for."""
+        frame = self._weighted(names)
+        frame['count'] = self.stratified.data.view(self.selection, list(names)).groupby(
+            list(names), observed=True).size().to_numpy()
+        frame['survived'] = frame['survived'] / frame['weight'] * frame['count']
+        return frame[list(names) + ['count', 'survived']]
+
+    def counts_by(self, name):
+        frame = self._weighted([name])
+        frame['count'] = frame['weight'].round().astype(np.int64)
+        return frame[[name, 'count']]
+
+    def correlation(self):
+        """Weighted pairwise-complete correlation of ``CORRELATION_COLUMNS``."""
+        rows = self._domain > 0
+        values = np.column_stack([self.stratified.data.values(name)[rows].astype(np.float64)
+                                  for name in CORRELATION_COLUMNS])
+        present = ~np.isnan(values)
+        values[~present] = 0.0
+        weights = self.stratified.weights[rows][:, None]
+        mask = present.astype(np.float64)
+        moments = np.stack([mask.T @ (mask * weights), values.T @ (mask * weights),
+                            (values ** 2).T @ (mask * weights), values.T @ (values * weights)])
+        return correlation_from_moments(moments)
+
+    def age_histogram(self):
+        return age_histogram(self.stratified.data, self.selection, weights=self.stratified.weights)
+
+    def density_grid(self):
+        return density_grid(self.stratified.data, self.selection, weights=self.stratified.weights)
+
+    def sample(self, max_points, columns, seed=0):
+        """At most ``max_points`` sampled rows drawn in proportion to their weight (an unweighted picture)."""
+        positions = np.arange(self.stratified.n_rows) if self.selection is None else self.selection
+        if len(positions) > max_points:
+            weights = self.stratified.weights[positions]
+            rng = np.random.default_rng(seed)
+            positions = np.sort(rng.choice(positions, max_points, replace=False, p=weights / weights.sum()))
+        return self.stratified.data.view(positions, columns)
+
+    def export(self, fmt):
+        return self.exact.export(fmt)
@@ -0,0 +1,309 @@
+"""Query backends behind the dashboard.
+
+A backend answers everything the pages ask of the passenger table:
+the sidebar choices (``categories``, ``bounds``) and, through
+``query(filters)``, a *view* of the filtered passengers with the metric
+values, grouped survival rates, correlation matrix, chart reductions and
+exports. ``survival_model()`` is the estimator's model, fitted once per
+dataset version (``titanic_model``), and ``stratified_sample()`` draws the
+sample behind approximate results (``titanic_approx``).
+
+Two backends ship:
+
+* ``pandas`` (default) keeps the table in memory as a ``SharedDataset`` and
+  answers from the ``FilterIndex`` and ``SurvivalCube`` built at load time.
+* ``duckdb`` (``titanic_duckdb``) leaves the data in Parquet and runs every
+  view as SQL with predicate pushdown, so tables larger than RAM work.
+
+Both keep a ``StatsCatalog`` (``titanic_stats``) of the table, persisted per
+dataset version, and answer ``categories``/``bounds`` from it.
+
+Pick one with ``TITANIC_BACKEND``; ``duckdb`` needs the ``duckdb``
+package, which ``requirements.txt`` installs.
+
+``BackendVersions`` watches the source file and swaps in a new backend
+when it changes. Rows appended to a CSV source are folded into the pandas
+backend's table, index, cube, catalog and model incrementally
+(``MemoryBackend.with_appended_rows``); any other change, and every change
+under DuckDB, loads the new version in full. A rerun takes one version at
+its start and keeps it to the end, whatever is swapped in meanwhile.
+"""
+import importlib
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+
+import numpy as np
+
+from titanic_approx import SAMPLE_STRATA, stratum_sizes
+from titanic_charts import age_histogram, density_grid, stratified_sample
+from titanic_cube import SurvivalCube
+from titanic_data import (DATA_PATH, SharedDataset, add_bins, appended_rows, load_dataset, source_signature,
+                          source_tail)
+from titanic_export import export_bytes
+from titanic_index import FilterIndex
+from titanic_model import MODEL_COLUMNS, TRAIN_MAX_ROWS, load_model, model_path_for
+from titanic_stats import StatsBuilder, dataset_stats, load_catalog, merge_stats, stats_path_for
+
+
+BACKEND = os.environ.get("TITANIC_BACKEND", "pandas")
+# How often the source file is checked for changes; 0 checks only when a rerun starts.
+WATCH_SECONDS = float(os.environ.get("TITANIC_WATCH_SECONDS", 5))
+
+# Backend name -> "module:class", imported only when selected.
+BACKENDS = {
+    'pandas': 'titanic_backend:MemoryBackend',
+    'duckdb': 'titanic_duckdb:DuckDBBackend',
+}
+
+
+def create_backend(name=BACKEND, path=DATA_PATH):
+    try:
+        module_name, class_name = BACKENDS[name].split(':')
+    except KeyError:
+        raise ValueError(f"Unknown backend {name!r}; choose one of {', '.join(BACKENDS)}") from None
+    return getattr(importlib.import_module(module_name), class_name)(path)
+
+
+# ---------------------- Versions ----------------------
+class BackendVersions:
+    """The current backend over ``path``, replaced whenever the source file changes.
+
+    ``current()`` is what a rerun calls once, at its start; the backend it
+    returns is never modified, so a rerun still rendering when a new version
+    is swapped in finishes on the one it took. A background thread checks
+    the source every ``watch_seconds`` so that the next rerun rarely waits
+    for the update.
+    """
+
+    def __init__(self, name=BACKEND, path=DATA_PATH, watch_seconds=WATCH_SECONDS):
+        self.name = name
+        self.path = path
+        self._backend = create_backend(name, path)
+        self._seen = source_signature(path)
+        self._lock = threading.Lock()
+        if watch_seconds > 0:
+            # The thread holds only a weak reference, so it ends once the versions are evicted.
+            threading.Thread(target=_watch, args=(weakref.ref(self), watch_seconds),
+                             name="titanic-watch", daemon=True).start()
+
+    def current(self):
+        self.refresh()
+        return self._backend
+
+    def refresh(self):
+        """Swap in a new version if the source changed since the last check.
+
+        An update already running elsewhere is not waited for: the caller
+        gets the version current until it finishes.
+        """
+        if source_signature(self.path) in (None, self._seen) or not self._lock.acquire(blocking=False):
+            return
+        try:
+            signature = source_signature(self.path)
+            if signature in (None, self._seen):
+                # Gone again, or swapped in by the update that held the lock.
+                return
+            backend = self._backend.with_appended_rows()
+            if backend is None:
+                backend = create_backend(self.name, self.path)
+            self._backend = backend
+            self._seen = signature
+        finally:
+            self._lock.release()
+
+
+def _watch(versions_ref, watch_seconds):
+    while True:
+        time.sleep(watch_seconds)
+        versions = versions_ref()
+        if versions is None:
+            return
+        try:
+            versions.refresh()
+        except Exception:
+            # A file caught mid-rewrite; the next check (or rerun) tries again.
+            pass
+        del versions
+
+
+# ---------------------- In-Memory Backend ----------------------
+class MemoryBackend:
+    """The whole table in shared read-only buffers, with the filter index and survival cube."""
+
+    name = 'pandas'
+
+    def __init__(self, path=DATA_PATH):
+        self.path = path
+        self.data = SharedDataset(add_bins(load_dataset(path)), source_signature(path))
+        self.signature = self.data.signature
+        self.columns = self.data.columns
+        self.n_rows = self.data.n_rows
+        self.index = FilterIndex(self.data)
+        self.cube = SurvivalCube(self.data)
+        self.stats = load_catalog(stats_path_for(path, self.name), self.signature,
+                                  lambda: dataset_stats(self.data))
+        self._tail = self._source_tail()
+        self._model = None
+        self._model_start = None
+        self._model_lock = threading.Lock()
+
+    def _source_tail(self):
+        """Digest of the end of a CSV source as loaded, or ``None`` when appends cannot be followed."""
+        if self.signature is None or Path(self.path).suffix != '.csv' or source_signature(self.path) != self.signature:
+            # No local file, a Parquet source, or the file changed while it was being read.
+            return None
+        return source_tail(self.path, self.signature['size'])
+
+    def with_appended_rows(self):
+        """A new backend with the rows appended to the CSV source since this one was loaded.
+
+        Only the new rows are read: the table, filter index and cube are
+        extended, their catalog is merged into this one's and the model is
+        refitted starting from this one's coefficients. Returns ``None`` when
+        the source changed in some other way, or the new rows need dtypes or
+        cube cells the loaded table lacks; the source must then be reloaded.
+        """
+        signature = source_signature(self.path)
+        if self._tail is None or signature is None or signature['size'] <= self.signature['size']:
+            return None
+        if source_tail(self.path, self.signature['size']) != self._tail:
+            return None
+        delta, end = appended_rows(self.path, self.signature['size'], signature['size'])
+        if delta is None:
+            # Only part of a line so far.
+            return self
+        grown = object.__new__(MemoryBackend)
+        grown.path = self.path
+        # Up to the last complete line; the rest is read with the next append.
+        grown.signature = dict(signature, size=end)
+        try:
+            grown.data = self.data.append(add_bins(delta), grown.signature)
+            grown.index = self.index.extended(grown.data)
+            grown.cube = self.cube.extended(grown.data)
+        except (KeyError, ValueError):
+            return None
+        grown.columns = grown.data.columns
+        grown.n_rows = grown.data.n_rows
+        added = StatsBuilder()
+        added.add(grown.data.view(np.arange(self.n_rows, grown.n_rows)))
+        grown.stats = load_catalog(stats_path_for(self.path, self.name), grown.signature,
+                                   lambda: merge_stats(self.stats.stats, added.result()))
+        grown._tail = source_tail(self.path, end)
+        grown._model = None
+        grown._model_start = None if self._model is None else self._model.params['coefficients']
+        grown._model_lock = threading.Lock()
+        return grown
+
+    def training_frame(self, max_rows=TRAIN_MAX_ROWS):
+        """The model inputs and ``Survived`` of every row, or of a uniform sample of ``max_rows``."""
+        rows = None
+        if self.n_rows > max_rows:
+            rows = np.sort(np.random.default_rng(0).choice(self.n_rows, max_rows, replace=False))
+        return self.data.view(rows, list(MODEL_COLUMNS) + ['Survived'])
+
+    def survival_model(self):
+        # Fitted (or read back) once per version, and kept so that the version with the next
+        # appended rows can start its fit from it.
+        with self._model_lock:
+            if self._model is None:
+                self._model = load_model(model_path_for(self.path, self.name), self.signature,
+                                         self.training_frame, self._model_start)
+        return self._model
+
+    def stratified_sample(self, max_rows, seed=0):
+        """``(frame, population)``: rows drawn at random within each ``SAMPLE_STRATA`` group, as many
+        as ``stratum_sizes`` allots it, and for each drawn row the size of its group in the table."""
+        groups = self.data.view(columns=list(SAMPLE_STRATA)).groupby(
+            list(SAMPLE_STRATA), observed=True, dropna=False, sort=False).indices
+        positions = list(groups.values())
+        sizes = stratum_sizes([len(group) for group in positions], max_rows)
+        rng = np.random.default_rng(seed)
+        drawn = [rng.choice(group, size, replace=False) for group, size in zip(positions, sizes)]
+        rows = np.concatenate(drawn)
+        population = np.concatenate([np.full(len(picked), len(group)) for picked, group in zip(drawn, positions)])
+        order = np.argsort(rows)
+        return self.data.view(rows[order]), population[order]
+
+    def categories(self, name):
+        if name in self.stats:
+            return self.stats.categories(name)
+        return self.data.categories(name)
+
+    def bounds(self, name):
+        if name in self.stats:
+            return self.stats.bounds(name)
+        values = self.data.values(name)
+        return float(np.nanmin(values)), float(np.nanmax(values))
+
+    def query(self, filters):
+        return MemoryView(self, filters)
+
+
+class MemoryView:
+    """Filtered passengers: cube-backed summaries, plus row-level work on a lazily built selection."""
+
+    def __init__(self, backend, filters):
+        self.backend = backend
+        self.filters = filters
+        self.summary = backend.cube.query(filters)
+        self._selection = None
+        self._selected = False
+        self._histogram = None
+        self._grid = None
+
+    @property
+    def selection(self):
+        if not self._selected:
+            self._selection = self.backend.index.select(self.filters)
+            self._selected = True
+        return self._selection
+
+    @property
+    def count(self):
+        return self.summary.count
+
+    @property
+    def survival_rate(self):
+        return self.summary.survival_rate
+
+    @property
+    def mean_age(self):
+        return self.summary.mean_age
+
+    @property
+    def mean_fare(self):
+        return self.summary.mean_fare
+
+    def survival_by(self, *names):
+        return self.summary.survival_by(*names)
+
+    def survival_counts(self, *names):
+        return self.summary.survival_counts(*names)
+
+    def counts_by(self, name):
+        return self.summary.counts_by(name)
+
+    def correlation(self):
+        return self.summary.correlation()
+
+    # Kept: views are shared through the result cache, and these read every selected row.
+    def age_histogram(self):
+        if self._histogram is None:
+            self._histogram = age_histogram(self.backend.data, self.selection)
+        return self._histogram
+
+    def density_grid(self):
+        if self._grid is None:
+            self._grid = density_grid(self.backend.data, self.selection)
+        return self._grid
+
+    def sample(self, max_points, columns):
+        """At most ``max_points`` rows of ``columns``, stratified by survival."""
+        rows = stratified_sample(self.backend.data, self.selection, max_points)
+        return self.backend.data.view(rows, columns)
+
+    def export(self, fmt):
+        return export_bytes(self.backend.data, self.selection, fmt)
@@ -0,0 +1,127 @@
+"""Bootstrap confidence intervals for grouped survival rates.
+
+Resampling a group's passengers with replacement and taking the survival
+rate is a binomial draw of ``n`` passengers at the group's rate. So
+every group and every replicate come from one ``rng.binomial`` call on an
+``(groups, replicates)`` matrix, never a Python loop over replicates.
+Replicates are drawn in fixed-size chunks, each with its own generator
+spawned from one seed, so the result does not depend on how many threads
+draw them; numpy releases the GIL while drawing, so the chunks run on a
+small thread pool in parallel.
+
+Intervals are the percentile bounds of replicates drawn at the observed
+rate, the rate the bars show. Every replicate of a group whose members all
+survived (or all died) has that same rate, so such groups get the Wilson
+score interval instead, which still widens as the group gets smaller.
+Intervals are kept per group sizes and survivor counts in a bounded LRU, so a rerun (or any
+filter state yielding the same groups) reuses them; the figures carrying
+them are also cached per filter signature with every other figure.
+
+``TITANIC_BOOTSTRAP_REPLICATES`` sets the replicate count (default 4000)
+and ``TITANIC_BOOTSTRAP_THREADS`` the pool size (``0`` or ``1`` draws inline).
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+
+BOOTSTRAP_REPLICATES = int(os.environ.get("TITANIC_BOOTSTRAP_REPLICATES", 4000))
+BOOTSTRAP_THREADS = int(os.environ.get("TITANIC_BOOTSTRAP_THREADS", min(4, os.cpu_count() or 1)))
+BOOTSTRAP_CHUNK = 1000
+BOOTSTRAP_CACHE_ENTRIES = 256
+CONFIDENCE = 0.95
+
+_pool = None
+_pool_lock = threading.Lock()
+_intervals = OrderedDict()
+_intervals_lock = threading.Lock()
+
+
+def _executor():
+    # Its own pool: the figure builds calling this may already run on the shared worker pool.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(BOOTSTRAP_THREADS, thread_name_prefix="titanic-bootstrap")
+        return _pool
+
+
+def _replicate_quantiles(counts, rates, replicates, seed, levels):
+    """Quantiles at ``levels`` of each group's replicate survival rate, ``(len(levels), groups)``."""
+    chunks = -(-replicates // BOOTSTRAP_CHUNK)
+    seeds = np.random.SeedSequence(seed).spawn(chunks)
+
+    def draw(i):
+        size = min(BOOTSTRAP_CHUNK, replicates - i * BOOTSTRAP_CHUNK)
+        rng = np.random.default_rng(seeds[i])
+        return rng.binomial(counts[:, None], rates[:, None], size=(len(counts), size))
+
+    if BOOTSTRAP_THREADS > 1 and chunks > 1:
+        blocks = list(_executor().map(draw, range(chunks)))
+    else:
+        blocks = [draw(i) for i in range(chunks)]
+    survivors = np.concatenate(blocks, axis=1)
+    return np.quantile(survivors / counts[:, None], levels, axis=1)
+
+
+def wilson_intervals(counts, survivors, confidence=CONFIDENCE):
+    """``(low, high)`` arrays: Wilson score bounds of each group's rate ``survivors / counts``."""
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    n = np.maximum(counts, 1).astype(np.float64)
+    rates = survivors / n
+    centre = (rates + z * z / (2 * n)) / (1 + z * z / n)
+    half = z / (1 + z * z / n) * np.sqrt(rates * (1 - rates) / n + z * z / (4 * n * n))
+    return np.clip(centre - half, 0.0, 1.0), np.clip(centre + half, 0.0, 1.0)
+
+
+def bootstrap_intervals(counts, survivors, replicates=BOOTSTRAP_REPLICATES, confidence=CONFIDENCE, seed=0):
+    """``(low, high)`` arrays: percentile bootstrap bounds of each group's rate ``survivors / counts``
+    (Wilson bounds where it is 0 or 1)."""
+    counts = np.asarray(counts, dtype=np.int64)
+    survivors = np.clip(np.asarray(survivors, dtype=np.int64), 0, counts)
+    key = (counts.tobytes(), survivors.tobytes(), replicates, confidence, seed)
+    with _intervals_lock:
+        if key in _intervals:
+            _intervals.move_to_end(key)
+            return _intervals[key]
+
+    levels = [(1 - confidence) / 2, (1 + confidence) / 2]
+    if len(counts) and replicates > 0:
+        rates = survivors / np.maximum(counts, 1)
+        low, high = _replicate_quantiles(np.maximum(counts, 1), rates, replicates, seed, levels)
+        # A group where all or none survived resamples to the same rate every time.
+        degenerate = (survivors == 0) | (survivors == counts)
+        wilson_low, wilson_high = wilson_intervals(counts, survivors, confidence)
+        low, high = np.where(degenerate, wilson_low, low), np.where(degenerate, wilson_high, high)
+        # Empty groups have no rate to bound.
+        low, high = np.where(counts > 0, low, np.nan), np.where(counts > 0, high, np.nan)
+    else:
+        low, high = np.full(len(counts), np.nan), np.full(len(counts), np.nan)
+
+    with _intervals_lock:
+        _intervals[key] = (low, high)
+        while len(_intervals) > BOOTSTRAP_CACHE_ENTRIES:
+            _intervals.popitem(last=False)
+    return low, high
+
+
+def survival_intervals(view, *names, replicates=BOOTSTRAP_REPLICATES):
+    """``view.survival_by(*names)`` plus each group's ``count`` and bootstrap bounds ``low``/``high``.
+
+    ``error_plus`` and ``error_minus`` are the distances from the rate to
+    the bounds, as Plotly's error bars take them (floored at 0 only against
+    the rounding of a sample view's estimated survivor counts).
+    """
+    frame = view.survival_counts(*names)
+    counts = frame['count'].to_numpy(dtype=np.int64)
+    survivors = np.round(frame['survived'].to_numpy(dtype=np.float64)).astype(np.int64)
+    low, high = bootstrap_intervals(counts, survivors, replicates)
+    frame['Survived'] = frame['survived'] / frame['count']
+    frame['low'], frame['high'] = low, high
+    frame['error_plus'] = np.maximum(frame['high'] - frame['Survived'], 0.0)
+    frame['error_minus'] = np.maximum(frame['Survived'] - frame['low'], 0.0)
+    return frame[list(names) + ['Survived', 'count', 'low', 'high', 'error_plus', 'error_minus']]
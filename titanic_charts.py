@@ -0,0 +1,136 @@
+"""Server-side reductions and static renderers for the chart panels.
+
+Large selections are reduced before they reach Plotly so the figure payload
+depends on the chart resolution, not on the number of passengers.
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Above this many points the scatter switches to a sampled WebGL trace or a density grid.
+SCATTER_MAX_POINTS = int(os.environ.get("TITANIC_SCATTER_MAX_POINTS", 5000))
+DENSITY_BINS = 60
+AGE_HISTOGRAM_BINS = 20
+
+
+# ---------------------- Scatter Reduction ----------------------
+def stratified_sample(data, selection, max_points, seed=0):
+    """Row positions of at most ``max_points`` rows keeping the survivor/non-survivor proportions.
+
+    Small selections are returned unchanged (``None`` still meaning every row).
+    """
+    positions = np.arange(data.n_rows) if selection is None else selection
+    if len(positions) <= max_points:
+        return selection
+    rng = np.random.default_rng(seed)
+    survived = data.values('Survived', positions)
+    picked = []
+    for outcome in np.unique(survived):
+        stratum = positions[survived == outcome]
+        take = max(1, int(round(max_points * len(stratum) / len(positions))))
+        picked.append(rng.choice(stratum, size=min(take, len(stratum)), replace=False))
+    return np.sort(np.concatenate(picked))
+
+
+def _weights(weights, selection, valid):
+    """Per-row ``weights`` (over all rows of the data) for the selected, valid rows; ``None`` stays ``None``."""
+    if weights is None:
+        return None
+    return (weights if selection is None else weights[selection])[valid]
+
+
+def density_grid(data, selection, bins=DENSITY_BINS, weights=None):
+    """Passenger counts and survival rate on an Age x Fare grid: ``(age_edges, fare_edges, counts, rate)``.
+
+    ``weights`` counts each row that many passengers (rows of a sample).
+    """
+    age = data.values('Age', selection)
+    fare = data.values('Fare', selection)
+    survived = data.values('Survived', selection)
+    valid = ~np.isnan(age) & ~np.isnan(fare)
+    weights = _weights(weights, selection, valid)
+    age, fare, survived = age[valid], fare[valid], survived[valid]
+    counts, age_edges, fare_edges = np.histogram2d(age, fare, bins=bins, weights=weights)
+    survivors, _, _ = np.histogram2d(age, fare, bins=[age_edges, fare_edges],
+                                     weights=survived if weights is None else survived * weights)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rate = np.where(counts > 0, survivors / counts, np.nan)
+    return age_edges, fare_edges, counts, rate
+
+
+# ---------------------- Histograms ----------------------
+HISTOGRAM_COLUMNS = ['Sex', 'Survived', 'Age', 'count']
+
+
+def histogram_frame(sexes, outcomes, edges, counts):
+    """One row per bar from ``counts`` shaped ``(len(sexes), len(outcomes), bins)``."""
+    bins = len(edges) - 1
+    centres = (edges[:-1] + edges[1:]) / 2
+    return pd.DataFrame({
+        'Sex': np.repeat(np.asarray(sexes), len(outcomes) * bins),
+        'Survived': np.tile(np.repeat(np.asarray(outcomes).astype(str), bins), len(sexes)),
+        'Age': np.tile(centres, len(sexes) * len(outcomes)),
+        'count': np.asarray(counts).reshape(-1),
+    }, columns=HISTOGRAM_COLUMNS)
+
+
+def empty_histogram():
+    return pd.DataFrame(columns=HISTOGRAM_COLUMNS), np.array([0.0, 1.0])
+
+
+def age_histogram(data, selection, bins=AGE_HISTOGRAM_BINS, weights=None):
+    """Age counts per (Sex, Survived) on shared bin edges.
+
+    Returns ``(frame, edges)`` where ``frame`` has one row per bar: ``Sex``,
+    ``Survived`` (as text, so Plotly colours it discretely), the bin centre
+    as ``Age`` and its ``count``. With ``weights`` each row counts that many
+    passengers.
+    """
+    age = data.values('Age', selection)
+    valid = ~np.isnan(age)
+    weights = _weights(weights, selection, valid)
+    age = age[valid]
+    if not len(age):
+        return empty_histogram()
+
+    edges = np.histogram_bin_edges(age, bins=bins)
+    bin_index = np.clip(np.searchsorted(edges, age, side='right') - 1, 0, bins - 1)
+    sex_codes, sexes = pd.factorize(data.series('Sex', selection)[valid], sort=True)
+    outcome_codes, outcomes = pd.factorize(data.values('Survived', selection)[valid], sort=True)
+    group = sex_codes * len(outcomes) + outcome_codes
+    counts = np.bincount(group * bins + bin_index, weights=weights, minlength=len(sexes) * len(outcomes) * bins)
+    return histogram_frame(sexes, outcomes, edges, counts), edges
+
+
+# ---------------------- Correlation Heatmap ----------------------
+def correlation_heatmap_png(corr):
+    """Render the correlation matrix to PNG bytes.
+
+    The figure is created with ``matplotlib.figure.Figure`` rather than
+    pyplot, so it is never registered with pyplot's global figure manager
+    and is released as soon as this function returns.
+    """
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    sns.heatmap(corr, annot=True, cmap='coolwarm', center=0, ax=ax,
+                annot_kws={"size": 10}, cbar_kws={"shrink": 0.8})
+    ax.set_facecolor('#0f2027')
+    fig.patch.set_facecolor('#0f2027')
+    ax.tick_params(colors='white')
+    cbar = ax.collections[0].colorbar
+    cbar.ax.yaxis.set_tick_params(color='white')
+    for label in ax.get_xticklabels() + ax.get_yticklabels():
+        label.set_color("white")
+
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format='png', facecolor=fig.get_facecolor(), bbox_inches='tight')
+    finally:
+        fig.clear()
+    return buffer.getvalue()
@@ -0,0 +1,335 @@
+"""Pre-aggregated survival cube.
+
+Every passenger falls into one cell of Sex x Pclass x Embarked x Fare_Bin x
+Age_Band x has-family. Each cell stores the passenger count, survivors and
+the Age/Fare sums and counts, so the metric cards and the grouped survival
+charts are answered by summing cells. Only passengers in an Age or Fare bin
+that the slider cuts through are read from the row data.
+
+Cells also carry pairwise sufficient statistics (counts, sums, sums of
+squares and cross-products) of the numeric columns, so the correlation
+matrix for any filter is a merge of cells rather than a rescan.
+
+Every cell statistic is a sum, so appended rows are folded in by adding
+their own aggregate (``extended``) instead of rebuilding the cube.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+from titanic_data import code_dtype
+
+
+DIMENSIONS = ('Sex', 'Pclass', 'Embarked', 'Fare_Bin', 'Age_Band', 'Family')
+BAND_DIMENSIONS = {'Fare_Bin': 'Fare', 'Age_Band': 'Age'}
+MEASURES = ('count', 'survived', 'age_sum', 'age_count', 'fare_sum', 'fare_count')
+CORRELATION_COLUMNS = ('Age', 'Fare', 'Pclass', 'SibSp', 'Parch', 'Survived')
+MOMENT_CHUNK_ROWS = 1_000_000
+
+
+# ---------------------- Cell Coordinates ----------------------
+def _dimension_codes(data, name, selection=None):
+    """Integer coordinate per row; missing values go to the extra last slot."""
+    if name == 'Family':
+        return ((data.values('SibSp', selection) > 0) | (data.values('Parch', selection) > 0)).astype(np.int64)
+    if data.is_categorical(name):
+        codes = data.values(name, selection).astype(np.int64)
+        size = len(data.categories(name))
+    else:
+        categories = data.categories(name)
+        codes = pd.Index(categories).get_indexer(data.values(name, selection))
+        size = len(categories)
+    return np.where(codes < 0, size, codes)
+
+
+def _measure_columns(data, selection=None):
+    age = data.values('Age', selection).astype(np.float64)
+    fare = data.values('Fare', selection).astype(np.float64)
+    age_ok, fare_ok = ~np.isnan(age), ~np.isnan(fare)
+    return {
+        'count': None,
+        'survived': data.values('Survived', selection).astype(np.float64),
+        'age_sum': np.where(age_ok, age, 0.0),
+        'age_count': age_ok.astype(np.float64),
+        'fare_sum': np.where(fare_ok, fare, 0.0),
+        'fare_count': fare_ok.astype(np.float64),
+    }
+
+
+def _pair_moments(values, present):
+    """Pairwise ``(N, S, Q, P)`` of an ``(n, k)`` block whose missing entries are zeroed.
+
+    ``N[i, j]`` counts rows where both columns are present, ``S[i, j]`` and
+    ``Q[i, j]`` sum ``x_i`` and ``x_i**2`` over those rows and ``P[i, j]``
+    sums ``x_i * x_j``; together they reproduce pandas' pairwise-complete
+    ``corr()``.
+    """
+    mask = present.astype(np.float64)
+    return np.stack([mask.T @ mask, values.T @ mask, (values ** 2).T @ mask, values.T @ values])
+
+
+def correlation_from_moments(moments, columns=CORRELATION_COLUMNS):
+    """Pearson correlation matrix from merged ``(N, S, Q, P)`` statistics."""
+    n, s, q, p = moments
+    with np.errstate(invalid='ignore', divide='ignore'):
+        spread = n * q - s ** 2
+        corr = (n * p - s * s.T) / np.sqrt(spread * spread.T)
+    corr = np.clip(corr, -1.0, 1.0)
+    diagonal = np.diag(spread) > 0
+    corr[np.diag_indices_from(corr)] = np.where(diagonal, 1.0, np.nan)
+    return pd.DataFrame(corr, index=list(columns), columns=list(columns))
+
+
+# ---------------------- Cube ----------------------
+class SurvivalCube:
+    """Load-time aggregate of the shared dataset over the low-cardinality filter dimensions."""
+
+    def __init__(self, data):
+        self._data = data
+        self.labels = {name: data.categories(name) for name in DIMENSIONS if name != 'Family'}
+        self.labels['Family'] = [False, True]
+        # One extra slot per dimension holds rows whose value is missing.
+        self.shape = tuple(len(self.labels[name]) + 1 for name in DIMENSIONS)
+        coords = [_dimension_codes(data, name) for name in DIMENSIONS]
+        self._row_cells = np.ravel_multi_index(coords, self.shape).astype(np.int32)
+        self.cells = self._aggregate(None)
+        self.moments = self._moments(None)
+
+        # Observed value extent of every band, and the rows in each band for edge fallbacks.
+        self._band_extent = {}
+        self._band_codes = {}
+        self._band_rows = {}
+        for band, column in BAND_DIMENSIONS.items():
+            codes = _dimension_codes(data, band)
+            size = self.shape[DIMENSIONS.index(band)]
+            values = data.values(column).astype(np.float64)
+            low = np.full(size, np.inf)
+            high = np.full(size, -np.inf)
+            np.fmin.at(low, codes, values)
+            np.fmax.at(high, codes, values)
+            order = np.argsort(codes, kind='stable')
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=size))])
+            self._band_extent[band] = (low, high)
+            self._band_codes[band] = codes.astype(code_dtype(size))
+            self._band_rows[band] = [order[offsets[i]:offsets[i + 1]] for i in range(size)]
+
+    def extended(self, data):
+        """The cube of ``data``, whose first rows are the ones aggregated here; only the rest are read.
+
+        Raises ``ValueError`` when the new rows bring a dimension value the
+        cube has no cell for (the cube must then be rebuilt).
+        """
+        for name in DIMENSIONS:
+            if name != 'Family' and data.categories(name) != self.labels[name]:
+                raise ValueError(f"New {name} values: {data.categories(name)}")
+        old_rows = len(self._row_cells)
+        rows = np.arange(old_rows, data.n_rows)
+        cube = copy.copy(self)
+        cube._data = data
+        cube._row_cells = np.concatenate([
+            self._row_cells,
+            np.ravel_multi_index([_dimension_codes(data, name, rows) for name in DIMENSIONS],
+                                 self.shape).astype(np.int32)])
+        cube.cells = self.cells + cube._aggregate(rows)
+        cube.moments = self.moments + cube._moments(rows)
+
+        cube._band_extent = {}
+        cube._band_codes = {}
+        cube._band_rows = {}
+        for band, column in BAND_DIMENSIONS.items():
+            codes = _dimension_codes(data, band, rows)
+            values = data.values(column, rows).astype(np.float64)
+            low, high = (extent.copy() for extent in self._band_extent[band])
+            np.fmin.at(low, codes, values)
+            np.fmax.at(high, codes, values)
+            cube._band_extent[band] = (low, high)
+            cube._band_codes[band] = np.concatenate([self._band_codes[band], codes.astype(self._band_codes[band].dtype)])
+            # New positions are all past the old ones, so appending keeps every band's rows sorted.
+            cube._band_rows[band] = [np.concatenate([old, rows[codes == i]])
+                                     for i, old in enumerate(self._band_rows[band])]
+        return cube
+
+    @property
+    def nbytes(self):
+        total = self.cells.nbytes + self.moments.nbytes + self._row_cells.nbytes
+        for band, rows in self._band_rows.items():
+            total += self._band_codes[band].nbytes + sum(r.nbytes for r in rows)
+        return total
+
+    def _aggregate(self, selection):
+        cell_ids = self._row_cells if selection is None else self._row_cells[selection]
+        n_cells = int(np.prod(self.shape))
+        columns = _measure_columns(self._data, selection)
+        out = np.empty((n_cells, len(MEASURES)))
+        for i, measure in enumerate(MEASURES):
+            out[:, i] = np.bincount(cell_ids, weights=columns[measure], minlength=n_cells)
+        return out.reshape(self.shape + (len(MEASURES),))
+
+    def _moments(self, selection):
+        """Per-cell correlation statistics, accumulated in row chunks to bound memory."""
+        k = len(CORRELATION_COLUMNS)
+        out = np.zeros((int(np.prod(self.shape)), 4, k, k))
+        n_rows = self._data.n_rows if selection is None else len(selection)
+        for start in range(0, n_rows, MOMENT_CHUNK_ROWS):
+            rows = slice(start, start + MOMENT_CHUNK_ROWS)
+            if selection is not None:
+                rows = selection[rows]
+            cells = self._row_cells[rows]
+            values = np.column_stack([self._data.values(name, rows).astype(np.float64)
+                                      for name in CORRELATION_COLUMNS])
+            present = ~np.isnan(values)
+            values[~present] = 0.0
+
+            order = np.argsort(cells, kind='stable')
+            cells, values, present = cells[order], values[order], present[order]
+            bounds = np.concatenate([[0], np.flatnonzero(np.diff(cells)) + 1, [len(cells)]])
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                out[cells[lo]] += _pair_moments(values[lo:hi], present[lo:hi])
+        return out.reshape(self.shape + (4, k, k))
+
+    def filtered_moments(self, weight, partial):
+        """Merged correlation statistics: weighted whole cells plus the cut-band rows."""
+        axes = tuple(range(len(DIMENSIONS)))
+        moments = np.tensordot(weight, self.moments, axes=(axes, axes))
+        if len(partial):
+            moments = moments + self._moments(partial).sum(axis=axes)
+        return moments
+
+    def _band_states(self, band, low, high):
+        """Per band: 1.0 when fully inside [low, high], 0.0 when fully outside, NaN when cut."""
+        band_low, band_high = self._band_extent[band]
+        empty = band_low > band_high
+        inside = (band_low >= low) & (band_high <= high)
+        outside = (band_high < low) | (band_low > high)
+        states = np.where(inside | empty, 1.0, np.where(outside, 0.0, np.nan))
+        states[-1] = 0.0  # missing Age/Fare never passes a range filter
+        return states
+
+    def _partial_rows(self, state, band_states):
+        rows = []
+        cut_before = []
+        for band, states in band_states.items():
+            cut = np.flatnonzero(np.isnan(states))
+            if not len(cut):
+                continue
+            band_rows = np.concatenate([self._band_rows[band][i] for i in cut])
+            # A row cut on both Age and Fare was already collected with the first band.
+            for other, other_cut in cut_before:
+                band_rows = band_rows[~np.isin(self._band_codes[other][band_rows], other_cut)]
+            rows.append(band_rows)
+            cut_before.append((band, cut))
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+        rows = np.concatenate(rows)
+        data = self._data
+        keep = np.ones(len(rows), dtype=bool)
+        for name, selected in state.categories().items():
+            keep &= np.isin(data.values(name, rows), data.isin_codes(name, selected))
+        for column, (low, high) in state.ranges().items():
+            values = data.values(column, rows)
+            keep &= (values >= low) & (values <= high)
+        if state.family_only:
+            keep &= (data.values('SibSp', rows) > 0) | (data.values('Parch', rows) > 0)
+        return rows[keep]
+
+    def query(self, state):
+        """Aggregate for a ``FilterState``: whole cells where possible, row data only for cut bands."""
+        masks = []
+        band_states = {}
+        for name in DIMENSIONS:
+            size = self.shape[DIMENSIONS.index(name)]
+            if name == 'Family':
+                mask = np.array([not state.family_only, True, False], dtype=float)
+            elif name in BAND_DIMENSIONS:
+                low, high = state.ranges()[BAND_DIMENSIONS[name]]
+                band_states[name] = self._band_states(name, low, high)
+                mask = np.nan_to_num(band_states[name], nan=0.0)
+            else:
+                selected = set(state.categories()[name])
+                mask = np.array([label in selected for label in self.labels[name]] + [False], dtype=float)
+            masks.append(mask.reshape([size if i == len(masks) else 1 for i in range(len(DIMENSIONS))]))
+
+        weight = masks[0]
+        for mask in masks[1:]:
+            weight = weight * mask
+        cells = self.cells * weight[..., None]
+
+        partial = self._partial_rows(state, band_states)
+        if len(partial):
+            cells = cells + self._aggregate(partial)
+        return CubeResult(cells, self.labels, lambda: self.filtered_moments(weight, partial))
+
+
+# ---------------------- Query Results ----------------------
+class CubeResult:
+    """Filtered cube; every metric and grouped survival rate is a sum over its cells."""
+
+    def __init__(self, cells, labels, moments=None):
+        self.cells = cells
+        self.labels = labels
+        self._totals = cells.reshape(-1, len(MEASURES)).sum(axis=0)
+        self._moments = moments
+
+    def correlation(self):
+        """Correlation matrix of ``CORRELATION_COLUMNS``, merged from cell statistics on first use."""
+        if callable(self._moments):
+            self._moments = self._moments()
+        return correlation_from_moments(self._moments)
+
+    def total(self, measure):
+        return float(self._totals[MEASURES.index(measure)])
+
+    def _ratio(self, numerator, denominator):
+        denominator = self.total(denominator)
+        return self.total(numerator) / denominator if denominator else float('nan')
+
+    @property
+    def count(self):
+        return int(round(self.total('count')))
+
+    @property
+    def survival_rate(self):
+        return self._ratio('survived', 'count')
+
+    @property
+    def mean_age(self):
+        return self._ratio('age_sum', 'age_count')
+
+    @property
+    def mean_fare(self):
+        return self._ratio('fare_sum', 'fare_count')
+
+    def grouped(self, *names):
+        """Measure totals per observed group of ``names`` as a DataFrame (one column per measure)."""
+        keep = [DIMENSIONS.index(name) for name in names]
+        drop = tuple(i for i in range(len(DIMENSIONS)) if i not in keep)
+        sums = self.cells.sum(axis=drop)
+        sums = sums.transpose([sorted(keep).index(i) for i in keep] + [len(keep)])
+        rows = []
+        for index in np.ndindex(sums.shape[:-1]):
+            if sums[index][0] < 0.5 or any(i == len(self.labels[name]) for i, name in zip(index, names)):
+                continue
+            row = {name: self.labels[name][i] for i, name in zip(index, names)}
+            row.update(zip(MEASURES, sums[index]))
+            rows.append(row)
+        frame = pd.DataFrame(rows, columns=list(names) + list(MEASURES))
+        frame['count'] = frame['count'].round().astype(np.int64)
+        for name in names:
+            if name in BAND_DIMENSIONS:
+                frame[name] = pd.Categorical(frame[name], categories=self.labels[name], ordered=True)
+        return frame
+
+    def survival_by(self, *names):
+        """Survival rate per observed group, like ``groupby(names, observed=True)['Survived'].mean()``."""
+        frame = self.grouped(*names)
+        frame['Survived'] = frame['survived'] / frame['count']
+        return frame[list(names) + ['Survived']]
+
+    def survival_counts(self, *names):
+        """Passengers (``count``) and survivors (``survived``) per observed group."""
+        return self.grouped(*names)[list(names) + ['count', 'survived']]
+
+    def counts_by(self, name):
+        """Passenger count per observed value of ``name``, like ``value_counts(sort=False)``."""
+        return self.grouped(name)[[name, 'count']]
@@ -0,0 +1,340 @@
+"""Data loading for the Titanic explorer.
+
+The dataset is read from the CSV shipped next to the app (falling back to the
+GitHub copy only when it is missing), narrowed to compact dtypes and written
+to a Parquet cache so later starts skip CSV parsing entirely.
+
+``SharedDataset`` wraps the loaded frame in read-only column buffers that are
+held once per process; sessions only keep selection vectors into it.
+
+A CSV source that only grew at the end (a pipeline appending passengers)
+does not need a reload: ``appended_rows`` reads just the new lines and
+``SharedDataset.append`` returns a new version with them added.
+"""
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# ---------------------- Locations ----------------------
+APP_DIR = Path(__file__).resolve().parent
+DATA_PATH = Path(os.environ.get("TITANIC_DATA_PATH", APP_DIR / "train_cleaned.csv"))
+CACHE_DIR = Path(os.environ.get("TITANIC_CACHE_DIR", APP_DIR / ".cache"))
+RAW_GITHUB_URL = "https://raw.githubusercontent.com/Rehmi-1/titanic-eda-app/main/train_cleaned.csv"
+
+# Bump whenever the dtype rules below change so stale caches are rebuilt.
+CACHE_VERSION = 1
+CACHE_META_KEY = b"titanic_source"
+
+# String columns with fewer distinct values than this share of rows become categoricals.
+CATEGORY_MAX_RATIO = 0.5
+
+
+def _edges_from_env(name, default):
+    raw = os.environ.get(name)
+    if not raw:
+        return default
+    return tuple(sorted(float(edge) for edge in raw.split(',')))
+
+
+# Upper (inclusive) edges of each bin; the last bin is open-ended. Override with
+# e.g. TITANIC_FARE_BINS="25,50,75,100,150,250" for finer bins.
+FARE_BIN_EDGES = _edges_from_env("TITANIC_FARE_BINS", (50, 100, 150))
+AGE_BAND_EDGES = _edges_from_env("TITANIC_AGE_BANDS", (12, 18, 35, 60))
+
+
+# ---------------------- Dtype Optimization ----------------------
+def optimize_dtypes(df):
+    """Return a copy of ``df`` using the narrowest dtypes that hold its values."""
+    out = {}
+    for name, col in df.items():
+        if pd.api.types.is_bool_dtype(col):
+            out[name] = col
+        elif pd.api.types.is_integer_dtype(col):
+            out[name] = pd.to_numeric(col, downcast='integer')
+        elif pd.api.types.is_float_dtype(col):
+            out[name] = col.astype('float32')
+        elif isinstance(col.dtype, pd.CategoricalDtype):
+            # Categories in value order, whatever order the source stored them in (Arrow: first seen).
+            out[name] = col if col.cat.ordered else col.cat.reorder_categories(sorted(col.cat.categories))
+        elif len(col) and col.nunique(dropna=True) <= CATEGORY_MAX_RATIO * len(col):
+            out[name] = col.astype('category')
+        else:
+            out[name] = col
+    return pd.DataFrame(out, index=df.index)
+
+
+# ---------------------- Binning ----------------------
+def _format_edge(edge):
+    return f"{edge:g}"
+
+
+def bin_labels(edges):
+    """Labels in the app's style: "0–50", "51–100", ..., "151+"."""
+    labels = [f"0–{_format_edge(edges[0])}"]
+    for low, high in zip(edges[:-1], edges[1:]):
+        labels.append(f"{_format_edge(low + 1)}–{_format_edge(high)}")
+    labels.append(f"{_format_edge(edges[-1] + 1)}+")
+    return labels
+
+
+def code_dtype(n_codes):
+    """Narrowest signed integer dtype for codes ``-1`` to ``n_codes - 1`` (int8 up to 128 codes)."""
+    return np.min_scalar_type(-n_codes)
+
+
+def bin_codes(values, edges):
+    """Vectorized bin lookup: code ``i`` holds ``edges[i-1] < value <= edges[i]``; NaN maps to -1."""
+    values = np.asarray(values)
+    codes = np.searchsorted(np.asarray(edges, dtype=values.dtype), values, side='left')
+    codes = codes.astype(code_dtype(len(edges) + 1))
+    if values.dtype.kind == 'f':
+        codes[np.isnan(values)] = -1
+    return codes
+
+
+def binned(values, edges):
+    return pd.Categorical.from_codes(bin_codes(values, edges), categories=bin_labels(edges), ordered=True)
+
+
+def add_bins(df, fare_edges=FARE_BIN_EDGES, age_edges=AGE_BAND_EDGES):
+    """Attach the ``Fare_Bin`` and ``Age_Band`` categorical columns, computed once at load time."""
+    df = df.copy()
+    df['Fare_Bin'] = binned(df['Fare'].to_numpy(), fare_edges)
+    df['Age_Band'] = binned(df['Age'].to_numpy(), age_edges)
+    return df
+
+
+# ---------------------- Columnar Cache ----------------------
+def source_signature(path=DATA_PATH):
+    """Cheap fingerprint of the source file; changes whenever the file is rewritten."""
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return {
+        "path": str(path.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "version": CACHE_VERSION,
+    }
+
+
+def source_tail(path, size, length=4096):
+    """Digest of the ``length`` bytes before offset ``size``: unchanged when the file was only appended to."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(max(0, size - length))
+            tail = f.read(min(size, length))
+    except OSError:
+        return None
+    if len(tail) < min(size, length) or not tail.endswith(b"\n"):
+        # Short read (the file shrank) or a last line still being written: not a clean prefix.
+        return None
+    return hashlib.sha256(tail).hexdigest()
+
+
+def appended_rows(path, start, stop):
+    """``(frame, end)``: the complete CSV lines between byte offsets ``start`` and ``stop``, parsed with
+    the file's header, and the offset just past the last of them (``start`` when there is none yet)."""
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(start)
+        delta = f.read(stop - start)
+    end = delta.rfind(b"\n") + 1
+    if not end:
+        return None, start
+    return pd.read_csv(io.BytesIO(header + delta[:end])), start + end
+
+
+def cache_path_for(path=DATA_PATH):
+    return CACHE_DIR / f"{Path(path).stem}.parquet"
+
+
+def _read_cache(cache_path, signature):
+    try:
+        stored = pq.read_schema(cache_path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    if json.loads(stored.get(CACHE_META_KEY, b"null")) != signature:
+        return None
+    return pd.read_parquet(cache_path)
+
+
+def _write_cache(df, cache_path, signature):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[CACHE_META_KEY] = json.dumps(signature).encode()
+    table = table.replace_schema_metadata(metadata)
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # A read-only deployment still works, it just re-parses the CSV each start.
+        tmp_path.unlink(missing_ok=True)
+
+
+# ---------------------- Loading ----------------------
+def load_dataset(path=DATA_PATH, remote_url=RAW_GITHUB_URL):
+    """Load the passenger table, preferring the local cache, then the local file, then the remote copy.
+
+    ``path`` may be a CSV or a Parquet file.
+    """
+    signature = source_signature(path)
+    if signature is None:
+        if remote_url is None:
+            raise FileNotFoundError(path)
+        return optimize_dtypes(pd.read_csv(remote_url))
+
+    if Path(path).suffix == '.parquet':
+        # Already columnar: nothing to gain from a second copy in the cache.
+        return optimize_dtypes(pd.read_parquet(path))
+
+    cache_path = cache_path_for(path)
+    df = _read_cache(cache_path, signature)
+    if df is None:
+        df = optimize_dtypes(pd.read_csv(path))
+        _write_cache(df, cache_path, signature)
+    return df
+
+
+# ---------------------- Shared Dataset ----------------------
+class SharedDataset:
+    """Immutable passenger table shared by every session of the server process.
+
+    Columns live in read-only numpy buffers (categoricals as their integer
+    codes). Sessions filter by building a *selection vector* of row positions
+    and gather only the columns a panel needs; ``selection=None`` means every
+    row and hands out zero-copy views.
+    """
+
+    def __init__(self, frame, signature=None):
+        self.signature = signature
+        self.columns = list(frame.columns)
+        self.n_rows = len(frame)
+        self._arrays = {}
+        self._dtypes = {}
+        for name, col in frame.items():
+            if isinstance(col.dtype, pd.CategoricalDtype):
+                arr = np.array(col.array.codes)
+            else:
+                arr = np.array(col.to_numpy())
+            arr.flags.writeable = False
+            self._arrays[name] = arr
+            self._dtypes[name] = col.dtype
+        self._categories = {}
+
+    def append(self, frame, signature=None):
+        """A new dataset: these rows followed by ``frame`` (same columns), in this dataset's dtypes.
+
+        Raises ``ValueError`` when ``frame`` holds something those dtypes cannot:
+        a category this dataset lacks, or an integer out of range or missing.
+        """
+        arrays = {}
+        for name in self.columns:
+            col = frame[name]
+            dtype = self._dtypes[name]
+            if isinstance(dtype, pd.CategoricalDtype):
+                codes = pd.Categorical(col, dtype=dtype).codes
+                if ((codes < 0) & col.notna().to_numpy()).any():
+                    raise ValueError(f"{name} has values the loaded table has not")
+                arr = codes.astype(self._arrays[name].dtype)
+            else:
+                values = col.to_numpy()
+                if dtype.kind in 'iub':
+                    if col.isna().any():
+                        raise ValueError(f"{name} has missing values")
+                    arr = values.astype(dtype)
+                    if not np.array_equal(arr, values):
+                        raise ValueError(f"{name} has values out of the range of {dtype}")
+                else:
+                    arr = np.array(col.astype(dtype).to_numpy())
+            arrays[name] = np.concatenate([self._arrays[name], arr])
+            arrays[name].flags.writeable = False
+
+        grown = object.__new__(SharedDataset)
+        grown.signature = signature
+        grown.columns = list(self.columns)
+        grown.n_rows = self.n_rows + len(frame)
+        grown._arrays = arrays
+        grown._dtypes = dict(self._dtypes)
+        # Distinct values seen so far plus the new rows' ones, without rescanning the old rows.
+        grown._categories = {}
+        for name, values in self._categories.items():
+            added = arrays[name][self.n_rows:]
+            grown._categories[name] = sorted(set(values) | set(pd.unique(added[~pd.isna(added)]).tolist()))
+        return grown
+
+    @property
+    def nbytes(self):
+        return sum(arr.nbytes for arr in self._arrays.values())
+
+    def is_categorical(self, name):
+        return isinstance(self._dtypes[name], pd.CategoricalDtype)
+
+    def categories(self, name):
+        """Distinct values of ``name`` in display order (category order for categoricals)."""
+        if self.is_categorical(name):
+            return list(self._dtypes[name].categories)
+        if name not in self._categories:
+            arr = self._arrays[name]
+            self._categories[name] = sorted(pd.unique(arr[~pd.isna(arr)]).tolist())
+        return list(self._categories[name])
+
+    def values(self, name, selection=None):
+        """Raw buffer of ``name`` (codes for categoricals), gathered to ``selection`` when given."""
+        arr = self._arrays[name]
+        return arr if selection is None else arr[selection]
+
+    def mean(self, name, selection=None):
+        """NaN-skipping mean over the selected rows (NaN for an empty selection)."""
+        arr = self.values(name, selection)
+        arr = arr[~np.isnan(arr)] if arr.dtype.kind == 'f' else arr
+        return float(arr.mean()) if len(arr) else float('nan')
+
+    def isin_codes(self, name, values):
+        """``values`` translated to what the raw buffer of ``name`` stores (codes for categoricals)."""
+        if self.is_categorical(name):
+            codes = self._dtypes[name].categories.get_indexer(list(values))
+            return codes[codes >= 0]
+        return np.asarray(list(values))
+
+    def isin(self, name, values):
+        """Boolean row mask for ``name in values`` evaluated on the shared buffer."""
+        return np.isin(self._arrays[name], self.isin_codes(name, values))
+
+    def between(self, name, low, high):
+        arr = self._arrays[name]
+        return (arr >= low) & (arr <= high)
+
+    def series(self, name, selection=None):
+        arr = self.values(name, selection)
+        if self.is_categorical(name):
+            arr = pd.Categorical.from_codes(arr, dtype=self._dtypes[name], validate=False)
+        return pd.Series(arr, name=name, copy=False)
+
+    def view(self, selection=None, columns=None):
+        """DataFrame over ``columns`` for the selected rows.
+
+        With ``selection=None`` the frame shares the process-wide buffers;
+        otherwise only the requested columns are gathered.
+        """
+        columns = self.columns if columns is None else columns
+        return pd.DataFrame({name: self.series(name, selection) for name in columns}, copy=False)
+
+
+def select_rows(mask):
+    """Turn a boolean row mask into a selection vector (``None`` when every row matches)."""
+    if mask.all():
+        return None
+    return np.flatnonzero(mask).astype(np.int32 if len(mask) < 2**31 else np.int64)
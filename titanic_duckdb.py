@@ -0,0 +1,465 @@
+"""DuckDB backend: every view is SQL over a Parquet file.
+
+Nothing is loaded into memory up front. Filters become a ``WHERE`` clause
+that DuckDB pushes into the Parquet scan (row groups whose statistics rule
+them out are skipped), and metrics, grouped rates, histograms and the
+correlation matrix are streaming aggregations, so only their small results
+reach Python. The scatter reads a bounded reservoir sample and exports are
+fetched in record batches.
+
+A CSV source is converted to Parquet once per version into the cache
+directory, named after its size and modification time and checked against
+the same source signature as the pandas loader's cache; a superseded copy
+is deleted once no backend reads it. The statistics catalog is cached by
+signature too, and lets filters that cannot exclude a row drop out of the ``WHERE`` clause (their columns are then not read at all).
+The survival model is fitted on a reservoir sample of the table, and the
+stratified sample for approximate results takes two scans.
+
+Needs the optional ``duckdb`` package; select it with ``TITANIC_BACKEND=duckdb``.
+"""
+import glob
+import json
+import os
+import threading
+import weakref
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from titanic_approx import SAMPLE_STRATA, stratum_sizes
+from titanic_charts import AGE_HISTOGRAM_BINS, DENSITY_BINS, empty_histogram, histogram_frame
+from titanic_cube import CORRELATION_COLUMNS
+from titanic_data import (AGE_BAND_EDGES, CACHE_DIR, CACHE_META_KEY, DATA_PATH, FARE_BIN_EDGES, add_bins,
+                          bin_labels, optimize_dtypes, source_signature)
+from titanic_export import EXPORT_CHUNK_ROWS, export_frames
+from titanic_model import MODEL_COLUMNS, TRAIN_MAX_ROWS, load_model, model_path_for
+from titanic_stats import (CATEGORY_STATS, NUMERIC_STATS, QUANTILES, histogram_quantiles, load_catalog,
+                           numeric_stats, stats_path_for)
+
+
+# Computed columns: name -> (source column, bin edges).
+BAND_COLUMNS = {'Fare_Bin': ('Fare', FARE_BIN_EDGES), 'Age_Band': ('Age', AGE_BAND_EDGES)}
+FAMILY_SQL = '("SibSp" > 0 OR "Parch" > 0)'
+
+
+# ---------------------- SQL Helpers ----------------------
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(text):
+    return "'" + str(text).replace("'", "''") + "'"
+
+
+def _band_code_sql(column, edges):
+    """Bin code as in ``bin_codes``: ``i`` holds ``edges[i-1] < value <= edges[i]``; NULL stays NULL."""
+    cases = " ".join(f"WHEN {_quote(column)} <= {float(edge)!r} THEN {i}" for i, edge in enumerate(edges))
+    return f"(CASE WHEN {_quote(column)} IS NULL THEN NULL {cases} ELSE {len(edges)} END)"
+
+
+def _band_label_sql(column, edges):
+    labels = bin_labels(edges)
+    cases = " ".join(f"WHEN {_quote(column)} <= {float(edge)!r} THEN {_literal(label)}"
+                     for edge, label in zip(edges, labels))
+    return f"(CASE WHEN {_quote(column)} IS NULL THEN NULL {cases} ELSE {_literal(labels[-1])} END)"
+
+
+def _dimension_sql(name):
+    """Grouping expression for ``name``: band columns group by their code, Family by the flag."""
+    if name in BAND_COLUMNS:
+        return _band_code_sql(*BAND_COLUMNS[name])
+    if name == 'Family':
+        return FAMILY_SQL
+    return _quote(name)
+
+
+def _column_sql(name):
+    if name in BAND_COLUMNS:
+        return f"{_band_label_sql(*BAND_COLUMNS[name])} AS {_quote(name)}"
+    return _quote(name)
+
+
+def where_sql(filters, stats=None):
+    """``(clause, params)`` for a ``FilterState``; ranges are inclusive and exclude NULLs, like the index.
+
+    Filters the ``stats`` catalog shows keep every row are left out.
+    """
+    clauses, params = [], []
+    for name, values in filters.categories().items():
+        if not values:
+            clauses.append("FALSE")
+            continue
+        if stats is not None and stats.covers(name, values):
+            continue
+        clauses.append(f"{_quote(name)} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    for name, (low, high) in filters.ranges().items():
+        if stats is not None and stats.covers(name, (low, high)):
+            continue
+        clauses.append(f"{_quote(name)} BETWEEN ? AND ?")
+        params.extend([low, high])
+    if filters.family_only:
+        clauses.append(FAMILY_SQL)
+    return " AND ".join(clauses) or "TRUE", params
+
+
+def _float(value):
+    return float('nan') if value is None else float(value)
+
+
+def _histogram_edges(low, high, bins):
+    """Same edges ``np.histogram_bin_edges`` would pick for data spanning ``[low, high]``."""
+    return np.histogram_bin_edges(np.array([low, high], dtype=np.float64), bins=bins)
+
+
+def _bin_sql(column, edges):
+    bins = len(edges) - 1
+    low, width = float(edges[0]), float(edges[-1] - edges[0]) / bins
+    return f"least(greatest(floor(({_quote(column)} - {low!r}) / {width!r}), 0), {bins - 1})::BIGINT"
+
+
+# ---------------------- Parquet Copies ----------------------
+# Every version of a CSV source gets its own copy, so a backend (and the views of sessions still
+# rendering it) keeps reading the rows its row count and catalog describe after the source changes.
+# Copies still referenced by a backend of this process are counted here.
+_open_copies = Counter()
+_copies_lock = threading.Lock()
+
+
+def copy_path_for(path, signature):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return CACHE_DIR / f"{stem}.{signature['size']}-{signature['mtime_ns']}.duckdb.parquet"
+
+
+def _remove_stale_copies(path, keep):
+    """Delete the copies of other versions of ``path`` that no backend uses any more."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    with _copies_lock:
+        for copy in CACHE_DIR.glob(f"{glob.escape(stem)}.*-*.duckdb.parquet"):
+            if copy != keep and not _open_copies[copy]:
+                copy.unlink(missing_ok=True)
+
+
+def _release_copy(cache_path, path):
+    with _copies_lock:
+        _open_copies[cache_path] -= 1
+        if _open_copies[cache_path] > 0:
+            return
+        del _open_copies[cache_path]
+        signature = source_signature(path)
+        if signature is None or copy_path_for(path, signature) != cache_path:
+            # Superseded: the current version has (or will get) its own copy.
+            cache_path.unlink(missing_ok=True)
+
+
+# ---------------------- Backend ----------------------
+class DuckDBBackend:
+    """Passenger table left on disk as Parquet and queried through DuckDB."""
+
+    name = 'duckdb'
+
+    def __init__(self, path=DATA_PATH):
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("The duckdb backend needs the 'duckdb' package (pip install duckdb)") from None
+
+        self.path = path
+        self.signature = source_signature(path)
+        if self.signature is None:
+            raise FileNotFoundError(path)
+        self._connection = duckdb.connect()
+        self._io_error = duckdb.IOException
+        self.table = self._source_table(path)
+
+        described = self.execute(f"DESCRIBE SELECT * FROM {self.table}").fetchall()
+        self.base_columns = [row[0] for row in described]
+        self.columns = self.base_columns + list(BAND_COLUMNS)
+        self.n_rows = self.execute(f"SELECT count(*) FROM {self.table}").fetchone()[0]
+        self._categories = {}
+        self.stats = load_catalog(stats_path_for(path, self.name), self.signature, self._compute_stats)
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def _source_table(self, path):
+        """Table expression over a Parquet copy of ``path``, converting a CSV once into the cache directory."""
+        path = os.fspath(path)
+        if path.endswith('.parquet'):
+            return f"read_parquet({_literal(path)})"
+        cache_path = copy_path_for(path, self.signature)
+        try:
+            stored = pq.read_schema(cache_path).metadata or {}
+            if json.loads(stored.get(CACHE_META_KEY, b"null")) == self.signature:
+                self._hold_copy(cache_path, path)
+                return f"read_parquet({_literal(str(cache_path))})"
+        except (OSError, pa.ArrowInvalid):
+            pass
+
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+        metadata = f"{{{CACHE_META_KEY.decode()}: {_literal(json.dumps(self.signature))}}}"
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self.execute(f"COPY (SELECT * FROM read_csv_auto({_literal(path)})) TO {_literal(str(tmp_path))} "
+                         f"(FORMAT PARQUET, KV_METADATA {metadata})")
+            os.replace(tmp_path, cache_path)
+        except (OSError, self._io_error):
+            # A read-only deployment still works, it just scans the CSV on every query.
+            tmp_path.unlink(missing_ok=True)
+            return f"read_csv_auto({_literal(path)})"
+        self._hold_copy(cache_path, path)
+        _remove_stale_copies(path, keep=cache_path)
+        return f"read_parquet({_literal(str(cache_path))})"
+
+    def _hold_copy(self, cache_path, path):
+        """Keep ``cache_path`` on disk while this backend lives; a superseded copy goes with its last backend."""
+        with _copies_lock:
+            _open_copies[cache_path] += 1
+        weakref.finalize(self, _release_copy, cache_path, path)
+
+    def execute(self, sql, params=None):
+        """Run ``sql`` on a fresh cursor, so concurrent sessions never share one."""
+        return self._connection.cursor().execute(sql, params or [])
+
+    def _compute_stats(self):
+        """Catalog contents from one grouped count per categorical column and one scan for the numeric ones.
+
+        Quantiles are DuckDB's t-digest estimates (an exact sort of every
+        column takes several seconds at 10M rows); min and max stay exact, as
+        they bound the sliders.
+        """
+        family_rows = self.execute(f"SELECT count(*) FILTER (WHERE {FAMILY_SQL}) FROM {self.table}").fetchone()[0]
+        columns = {}
+        for name in CATEGORY_STATS:
+            if name not in self.base_columns:
+                continue
+            rows = self.execute(f"SELECT {_quote(name)}, count(*) FROM {self.table} "
+                                "GROUP BY 1 ORDER BY 1 NULLS LAST").fetchall()
+            columns[name] = {'nulls': sum(count for value, count in rows if value is None),
+                             'values': [[value, count] for value, count in rows if value is not None]}
+        levels = list(QUANTILES) + histogram_quantiles()
+        numeric = [name for name in NUMERIC_STATS if name in self.base_columns]
+        if numeric:
+            aggregates = ", ".join(f"count(*) - count({_quote(name)}), min({_quote(name)}), max({_quote(name)}), "
+                                   f"approx_quantile({_quote(name)}, {levels!r})" for name in numeric)
+            row = self.execute(f"SELECT {aggregates} FROM {self.table}").fetchone()
+            for i, name in enumerate(numeric):
+                nulls, low, high, quantiles = row[4 * i:4 * i + 4]
+                quantiles = list(quantiles or [None] * len(levels))
+                quantiles[len(QUANTILES)], quantiles[-1] = low, high
+                columns[name] = numeric_stats(nulls, quantiles)
+        return {'rows': self.n_rows, 'family_rows': family_rows, 'columns': columns}
+
+    def training_frame(self, max_rows=TRAIN_MAX_ROWS):
+        """The model inputs and ``Survived`` of every row, or of a reservoir sample of ``max_rows``."""
+        select = ", ".join(_quote(name) for name in MODEL_COLUMNS + ('Survived',))
+        sample = f" USING SAMPLE reservoir({int(max_rows)} ROWS) REPEATABLE (0)" if self.n_rows > max_rows else ""
+        return self.execute(f"SELECT {select} FROM {self.table}{sample}").df()
+
+    def stratified_sample(self, max_rows, seed=0):
+        """Same as ``MemoryBackend.stratified_sample``, in two scans: the group sizes, then one
+        Bernoulli draw per row at its group's rate (so a group's sample size is about its allotment)."""
+        keys = ", ".join(_quote(name) for name in SAMPLE_STRATA)
+        groups = self.execute(f"SELECT {keys}, count(*) FROM {self.table} GROUP BY ALL").fetchall()
+        sizes = stratum_sizes([group[-1] for group in groups], max_rows)
+        match = " AND ".join(f"{_quote(name)} IS NOT DISTINCT FROM ?" for name in SAMPLE_STRATA)
+        stratum = "CASE " + " ".join(f"WHEN {match} THEN {i + 1}" for i in range(len(groups))) + " END"
+        rates = ", ".join(repr(float(size) / group[-1]) for size, group in zip(sizes, groups))
+        columns = ", ".join(_quote(name) for name in self.base_columns)
+        cursor = self.execute("SELECT setseed(?)", [1 / (seed + 2)])
+        frame = cursor.execute(
+            f"SELECT * FROM (SELECT {columns}, {stratum} AS __stratum FROM {self.table}) "
+            f"WHERE random() < [{rates}][__stratum]", [value for group in groups for value in group[:-1]]).df()
+        population = np.array([groups[i - 1][-1] for i in frame.pop('__stratum')])
+        return add_bins(optimize_dtypes(frame)), population
+
+    def with_appended_rows(self):
+        """Always ``None``: a changed source is converted to Parquet again in full."""
+        return None
+
+    def survival_model(self):
+        # Fitted (or read back) once per version.
+        with self._model_lock:
+            if self._model is None:
+                self._model = load_model(model_path_for(self.path, self.name), self.signature, self.training_frame)
+        return self._model
+
+    def categories(self, name):
+        if name in BAND_COLUMNS:
+            return bin_labels(BAND_COLUMNS[name][1])
+        if name in self.stats:
+            return self.stats.categories(name)
+        if name not in self._categories:
+            rows = self.execute(f"SELECT DISTINCT {_quote(name)} FROM {self.table} "
+                                f"WHERE {_quote(name)} IS NOT NULL ORDER BY 1").fetchall()
+            self._categories[name] = [row[0] for row in rows]
+        return list(self._categories[name])
+
+    def bounds(self, name):
+        if name in self.stats:
+            return self.stats.bounds(name)
+        low, high = self.execute(f"SELECT min({_quote(name)}), max({_quote(name)}) FROM {self.table}").fetchone()
+        return _float(low), _float(high)
+
+    def query(self, filters):
+        return DuckDBView(self, filters)
+
+
+class DuckDBView:
+    """Filtered passengers as a ``WHERE`` clause; each statistic is one aggregate query."""
+
+    def __init__(self, backend, filters):
+        self.backend = backend
+        self.filters = filters
+        self._where, self._params = where_sql(filters, backend.stats)
+        self._totals = None
+        self._results = {}
+
+    def _select(self, columns, where="", tail="", params=()):
+        sql = f"SELECT {columns} FROM {self.backend.table} WHERE {self._where}"
+        if where:
+            sql += f" AND {where}"
+        return self.backend.execute(f"{sql} {tail}", self._params + list(params))
+
+    def _summary(self):
+        if self._totals is None:
+            self._totals = self._select('count(*), avg("Survived"), avg("Age"), avg("Fare")').fetchone()
+        return self._totals
+
+    @property
+    def count(self):
+        return int(self._summary()[0])
+
+    @property
+    def survival_rate(self):
+        return _float(self._summary()[1])
+
+    @property
+    def mean_age(self):
+        return _float(self._summary()[2])
+
+    @property
+    def mean_fare(self):
+        return _float(self._summary()[3])
+
+    def _memo(self, key, compute):
+        # Views are shared through the result cache: a panel drawn again, or warmed up at start, costs no scan.
+        if key not in self._results:
+            self._results[key] = compute()
+        return self._results[key]
+
+    def _grouped(self, names, measure):
+        # A copy: callers add and convert columns.
+        return self._memo(('grouped', tuple(names), measure), lambda: self._scan_grouped(names, measure)).copy()
+
+    def _scan_grouped(self, names, measure):
+        keys = ", ".join(f"{_dimension_sql(name)} AS {_quote(name)}" for name in names)
+        order = ", ".join(str(i + 1) for i in range(len(names)))
+        frame = self._select(f"{keys}, {measure}", tail=f"GROUP BY {order} ORDER BY {order}").df()
+        frame = frame.dropna(subset=list(names)).reset_index(drop=True)
+        for name in names:
+            if name in BAND_COLUMNS:
+                labels = bin_labels(BAND_COLUMNS[name][1])
+                frame[name] = pd.Categorical.from_codes(frame[name].astype(np.int64), categories=labels, ordered=True)
+            elif name == 'Family':
+                frame[name] = frame[name].astype(bool)
+        return frame
+
+    def survival_by(self, *names):
+        """Survival rate per observed group, like ``groupby(names, observed=True)['Survived'].mean()``."""
+        return self._grouped(names, 'avg("Survived") AS "Survived"')
+
+    def survival_counts(self, *names):
+        """Passengers (``count``) and survivors (``survived``) per observed group."""
+        frame = self._grouped(names, 'count(*) AS "count", sum("Survived") AS "survived"')
+        frame['count'] = frame['count'].astype(np.int64)
+        return frame
+
+    def counts_by(self, name):
+        frame = self._grouped([name], 'count(*) AS "count"')
+        frame['count'] = frame['count'].astype(np.int64)
+        return frame
+
+    def correlation(self):
+        """Pairwise-complete correlation of ``CORRELATION_COLUMNS`` in one scan."""
+        return self._memo('correlation', self._scan_correlation)
+
+    def _scan_correlation(self):
+        names = list(CORRELATION_COLUMNS)
+        pairs = [(i, j) for i in range(len(names)) for j in range(i, len(names))]
+        row = self._select(", ".join(f"corr({_quote(names[i])}, {_quote(names[j])})" for i, j in pairs)).fetchone()
+        matrix = np.full((len(names), len(names)), np.nan)
+        for (i, j), value in zip(pairs, row):
+            matrix[i, j] = matrix[j, i] = _float(value)
+        return pd.DataFrame(matrix, index=names, columns=names)
+
+    def age_histogram(self, bins=AGE_HISTOGRAM_BINS):
+        """Same frame and edges as ``titanic_charts.age_histogram``."""
+        return self._memo(('age_histogram', bins), lambda: self._scan_age_histogram(bins))
+
+    def _scan_age_histogram(self, bins):
+        low, high = self._select('min("Age"), max("Age")').fetchone()
+        if low is None:
+            return empty_histogram()
+        edges = _histogram_edges(low, high, bins)
+        rows = self._select(f'"Sex", "Survived", {_bin_sql("Age", edges)}, count(*)',
+                            where='"Age" IS NOT NULL', tail="GROUP BY 1, 2, 3").fetchall()
+        sexes = sorted({row[0] for row in rows})
+        outcomes = sorted({row[1] for row in rows})
+        counts = np.zeros((len(sexes), len(outcomes), bins), dtype=np.int64)
+        for sex, outcome, index, count in rows:
+            counts[sexes.index(sex), outcomes.index(outcome), index] = count
+        return histogram_frame(sexes, outcomes, edges, counts), edges
+
+    def density_grid(self, bins=DENSITY_BINS):
+        """Same ``(age_edges, fare_edges, counts, rate)`` as ``titanic_charts.density_grid``."""
+        return self._memo(('density_grid', bins), lambda: self._scan_density_grid(bins))
+
+    def _scan_density_grid(self, bins):
+        valid = '"Age" IS NOT NULL AND "Fare" IS NOT NULL'
+        age_low, age_high, fare_low, fare_high = self._select(
+            'min("Age"), max("Age"), min("Fare"), max("Fare")', where=valid).fetchone()
+        if age_low is None:
+            age_low = age_high = fare_low = fare_high = 0.0
+        age_edges = _histogram_edges(age_low, age_high, bins)
+        fare_edges = _histogram_edges(fare_low, fare_high, bins)
+        rows = self._select(f'{_bin_sql("Age", age_edges)}, {_bin_sql("Fare", fare_edges)}, '
+                            'count(*), sum("Survived")', where=valid, tail="GROUP BY 1, 2").fetchall()
+        counts = np.zeros((bins, bins))
+        survivors = np.zeros((bins, bins))
+        for age_index, fare_index, count, survived in rows:
+            counts[age_index, fare_index] = count
+            survivors[age_index, fare_index] = survived
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rate = np.where(counts > 0, survivors / counts, np.nan)
+        return age_edges, fare_edges, counts, rate
+
+    def sample(self, max_points, columns, seed=0):
+        """At most ``max_points`` rows of ``columns``, a reservoir sample per survival outcome."""
+        select = ", ".join(_column_sql(name) for name in columns)
+        if self.count <= max_points:
+            return self._select(select).df()
+        strata = self._select('"Survived", count(*)', tail="GROUP BY 1 ORDER BY 1").fetchall()
+        frames = []
+        for outcome, size in strata:
+            take = min(size, max(1, int(round(max_points * size / self.count))))
+            sql = (f"SELECT * FROM (SELECT {select} FROM {self.backend.table} WHERE {self._where} "
+                   f'AND "Survived" = ?) USING SAMPLE reservoir({take} ROWS) REPEATABLE ({seed})')
+            frames.append(self.backend.execute(sql, self._params + [outcome]).df())
+        return pd.concat(frames, ignore_index=True)
+
+    def _export_frames(self):
+        select = ", ".join(_column_sql(name) for name in self.backend.columns)
+        reader = self._select(select).fetch_record_batch(EXPORT_CHUNK_ROWS)
+        empty = True
+        for batch in reader:
+            empty = False
+            yield batch.to_pandas()
+        if empty:
+            yield reader.schema.empty_table().to_pandas()
+
+    def export(self, fmt):
+        return export_frames(self._export_frames(), fmt)
+
@@ -0,0 +1,98 @@
+"""On-demand export of the filtered passengers.
+
+Files are written a chunk of rows at a time straight into the output
+buffer, so no full-size CSV string or intermediate DataFrame is built:
+CSV and gzip-CSV stream ``to_csv`` per chunk, Parquet writes one row group
+per chunk and Arrow IPC one record batch per chunk.
+"""
+import gzip
+import io
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+EXPORT_CHUNK_ROWS = int(os.environ.get("TITANIC_EXPORT_CHUNK_ROWS", 250_000))
+
+
+# ---------------------- Chunking ----------------------
+def _chunks(data, selection, chunk_rows):
+    """Selections of at most ``chunk_rows`` rows each; slices of the shared buffers when ``selection`` is None."""
+    n_rows = data.n_rows if selection is None else len(selection)
+    if n_rows == 0:
+        yield np.empty(0, dtype=np.int64)
+        return
+    for start in range(0, n_rows, chunk_rows):
+        stop = min(start + chunk_rows, n_rows)
+        yield slice(start, stop) if selection is None else selection[start:stop]
+
+
+def _frames(data, selection, chunk_rows):
+    for rows in _chunks(data, selection, chunk_rows):
+        yield data.view(rows)
+
+
+def _tables(frames):
+    for frame in frames:
+        yield pa.Table.from_pandas(frame, preserve_index=False)
+
+
+# ---------------------- Writers ----------------------
+# Each writer takes an iterable of DataFrame chunks with the same columns (at least one,
+# possibly empty, so the header/schema is always written).
+def _write_csv(frames, buffer):
+    text = io.TextIOWrapper(buffer, encoding='utf-8', newline='')
+    for i, frame in enumerate(frames):
+        frame.to_csv(text, index=False, header=i == 0)
+    text.flush()
+    text.detach()
+
+
+def _write_csv_gzip(frames, buffer):
+    with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as compressed:
+        _write_csv(frames, compressed)
+
+
+def _write_parquet(frames, buffer):
+    writer = None
+    for table in _tables(frames):
+        if writer is None:
+            writer = pq.ParquetWriter(buffer, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+def _write_arrow(frames, buffer):
+    writer = None
+    for table in _tables(frames):
+        if writer is None:
+            writer = pa.ipc.new_file(buffer, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+# Label -> (file extension, MIME type, writer).
+EXPORT_FORMATS = {
+    "CSV": ('csv', 'text/csv', _write_csv),
+    "CSV (gzip)": ('csv.gz', 'application/gzip', _write_csv_gzip),
+    "Parquet": ('parquet', 'application/vnd.apache.parquet', _write_parquet),
+    "Arrow IPC": ('arrow', 'application/vnd.apache.arrow.file', _write_arrow),
+}
+
+
+def export_frames(frames, fmt="CSV"):
+    """DataFrame chunks encoded as one ``fmt`` file (a key of ``EXPORT_FORMATS``)."""
+    buffer = io.BytesIO()
+    EXPORT_FORMATS[fmt][2](frames, buffer)
+    return buffer.getvalue()
+
+
+def export_bytes(data, selection, fmt="CSV", chunk_rows=EXPORT_CHUNK_ROWS):
+    """The selected rows of ``data`` encoded as ``fmt``."""
+    return export_frames(_frames(data, selection, chunk_rows), fmt)
+
+
+def export_file_name(fmt, stem="titanic_filtered"):
+    return f"{stem}.{EXPORT_FORMATS[fmt][0]}"
@@ -0,0 +1,91 @@
+"""Page sections that rerun on their own.
+
+``timed_fragment`` turns a section into a Streamlit fragment: a widget
+inside it reruns just that function, not the whole script, so the data
+load, sidebar filters, CSS blocks and other sections are skipped. Each run
+of a section is timed and kept in session state under
+``FRAGMENT_TIMINGS_KEY`` (and reported to ``titanic_profile`` when profiling is on).
+
+``rerun_when`` polls a condition and reruns the page once it holds;
+``rerun_when_done`` uses it for background work (exact results refining an
+approximate section).
+"""
+import functools
+import logging
+import threading
+import time
+
+import streamlit as st
+
+from titanic_profile import begin_run, current_profiler, is_fragment_run
+
+
+FRAGMENT_TIMINGS_KEY = 'fragment_timings'
+REFINE_POLL_SECONDS = 0.5
+
+logger = logging.getLogger(__name__)
+
+
+class _Nesting(threading.local):
+    depth = 0
+
+
+# Fragments run inside each other (the estimator sits in the visualization section).
+_nesting = _Nesting()
+
+
+def record_timing(name, seconds):
+    """Keep the latest, total and count of run times for section ``name`` in session state."""
+    timings = st.session_state.setdefault(FRAGMENT_TIMINGS_KEY, {})
+    entry = timings.setdefault(name, {'runs': 0, 'total_ms': 0.0, 'last_ms': 0.0})
+    entry['runs'] += 1
+    entry['last_ms'] = seconds * 1000
+    entry['total_ms'] += seconds * 1000
+    logger.debug("fragment %s ran in %.1f ms", name, seconds * 1000)
+
+
+def timed_fragment(name, **fragment_kwargs):
+    """``st.fragment`` that also records how long each run of the section takes.
+
+    With profiling on, the section is a stage of the current run; when it
+    reruns on its own (outermost fragment of a fragment rerun) it is written
+    out as a run of its own.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            partial = _nesting.depth == 0 and is_fragment_run()
+            profiler = begin_run(kind=name) if partial else current_profiler()
+            _nesting.depth += 1
+            start = time.perf_counter()
+            try:
+                with profiler.stage(name):
+                    return func(*args, **kwargs)
+            finally:
+                _nesting.depth -= 1
+                record_timing(name, time.perf_counter() - start)
+                if partial:
+                    profiler.finish()
+        return st.fragment(run, **fragment_kwargs)
+    return decorate
+
+
+def rerun_when(ready, poll_seconds=REFINE_POLL_SECONDS):
+    """Rerun the whole page once ``ready()`` returns true, checking every ``poll_seconds``.
+
+    Only this run polls: a rerun that still needs to wait calls this again.
+    """
+    @st.fragment(run_every=poll_seconds)
+    def poll():
+        if ready():
+            st.rerun()
+    poll()
+
+
+def rerun_when_done(futures, poll_seconds=REFINE_POLL_SECONDS):
+    """Rerun the whole page once every future in ``futures`` is done, checking every ``poll_seconds``.
+
+    The rerun finds the finished results in the caches and draws them in
+    place of the approximate ones; it does not poll again.
+    """
+    rerun_when(lambda: all(future.done() for future in futures), poll_seconds)
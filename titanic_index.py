@@ -0,0 +1,228 @@
+"""Load-time indexes over the shared dataset.
+
+``FilterIndex`` answers the sidebar filters without rebuilding full-length
+boolean masks on every rerun: categorical values and the family flag are
+stored as packed bitsets (plus their row positions), and Age/Fare keep a
+sorted permutation so a range becomes two binary searches. When rows are
+appended, ``extended`` indexes only the new rows and merges them in.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+
+CATEGORY_COLUMNS = ('Sex', 'Pclass', 'Embarked')
+RANGE_COLUMNS = ('Age', 'Fare')
+
+# Above this share of matching rows a packed-bitset scan beats gathering candidates.
+SCAN_RATIO = 0.5
+
+
+# ---------------------- Filter State ----------------------
+@dataclass(frozen=True)
+class FilterState:
+    """Canonical sidebar selection: sorted category sets, inclusive ranges and the family flag."""
+    sexes: tuple
+    pclasses: tuple
+    embarked: tuple
+    age_range: tuple
+    fare_range: tuple
+    family_only: bool = False
+
+    @classmethod
+    def create(cls, sexes, pclasses, embarked, age_range, fare_range, family_only=False):
+        return cls(
+            sexes=tuple(sorted(sexes)),
+            pclasses=tuple(sorted(int(p) for p in pclasses)),
+            embarked=tuple(sorted(embarked)),
+            age_range=(age_range[0], age_range[1]),
+            fare_range=(fare_range[0], fare_range[1]),
+            family_only=bool(family_only),
+        )
+
+    def categories(self):
+        return {'Sex': self.sexes, 'Pclass': self.pclasses, 'Embarked': self.embarked}
+
+    def ranges(self):
+        return {'Age': self.age_range, 'Fare': self.fare_range}
+
+
+# ---------------------- Bitset Helpers ----------------------
+def _pack(mask):
+    return np.packbits(mask)
+
+
+def _test_bits(bits, positions):
+    return ((bits[positions >> 3] >> (7 - (positions & 7)).astype(np.uint8)) & 1).astype(bool)
+
+
+def _append_bits(bits, n_bits, mask):
+    """The packed ``n_bits`` of ``bits`` followed by ``mask``; only the last partial byte is repacked."""
+    used = n_bits % 8
+    if not used:
+        return np.concatenate([bits, _pack(mask)])
+    head = np.unpackbits(bits[-1:], count=used).astype(bool)
+    return np.concatenate([bits[:-1], _pack(np.concatenate([head, mask]))])
+
+
+# ---------------------- Filter Index ----------------------
+class FilterIndex:
+    """Precomputed bitsets and sorted permutations for the sidebar filters."""
+
+    def __init__(self, data):
+        self.n_rows = data.n_rows
+        self._data = data
+        self._bits = {}
+        self._positions = {}
+        for name in CATEGORY_COLUMNS:
+            self._bits[name] = {}
+            self._positions[name] = {}
+            for value in data.categories(name):
+                match = data.isin(name, [value])
+                self._bits[name][value] = _pack(match)
+                self._positions[name][value] = np.flatnonzero(match).astype(np.int64)
+
+        family = (data.values('SibSp') > 0) | (data.values('Parch') > 0)
+        self._family_bits = _pack(family)
+        self._family_positions = np.flatnonzero(family).astype(np.int64)
+
+        self._order = {}
+        self._sorted = {}
+        for name in RANGE_COLUMNS:
+            values = data.values(name)
+            order = np.argsort(values, kind='stable')
+            self._order[name] = order
+            self._sorted[name] = values[order]
+
+    def extended(self, data):
+        """The index of ``data``, whose first ``n_rows`` rows are the ones indexed here."""
+        old_rows = self.n_rows
+        rows = slice(old_rows, data.n_rows)
+        offset = np.int64(old_rows)
+        index = object.__new__(FilterIndex)
+        index.n_rows = data.n_rows
+        index._data = data
+        index._bits = {}
+        index._positions = {}
+        empty_bits = _pack(np.zeros(old_rows, dtype=bool))
+        for name in CATEGORY_COLUMNS:
+            index._bits[name] = {}
+            index._positions[name] = {}
+            codes = data.values(name, rows)
+            for value in data.categories(name):
+                match = np.isin(codes, data.isin_codes(name, [value]))
+                index._bits[name][value] = _append_bits(self._bits[name].get(value, empty_bits), old_rows, match)
+                index._positions[name][value] = np.concatenate([
+                    self._positions[name].get(value, np.empty(0, dtype=np.int64)), offset + np.flatnonzero(match)])
+
+        family = (data.values('SibSp', rows) > 0) | (data.values('Parch', rows) > 0)
+        index._family_bits = _append_bits(self._family_bits, old_rows, family)
+        index._family_positions = np.concatenate([self._family_positions, offset + np.flatnonzero(family)])
+
+        # Merge the sorted new values into the sorted old ones, after any equal old value.
+        index._order = {}
+        index._sorted = {}
+        for name in RANGE_COLUMNS:
+            values = data.values(name, rows)
+            order = np.argsort(values, kind='stable')
+            at = np.searchsorted(self._sorted[name], values[order], side='right')
+            index._order[name] = np.insert(self._order[name], at, offset + order)
+            index._sorted[name] = np.insert(self._sorted[name], at, values[order])
+        return index
+
+    @property
+    def nbytes(self):
+        total = self._family_bits.nbytes + self._family_positions.nbytes
+        for name in CATEGORY_COLUMNS:
+            total += sum(b.nbytes for b in self._bits[name].values())
+            total += sum(p.nbytes for p in self._positions[name].values())
+        for name in RANGE_COLUMNS:
+            total += self._order[name].nbytes + self._sorted[name].nbytes
+        return total
+
+    def _range_bounds(self, name, low, high):
+        sorted_values = self._sorted[name]
+        # Cast the bounds so numpy searches the float32 buffer instead of upcasting it.
+        low, high = sorted_values.dtype.type(low), sorted_values.dtype.type(high)
+        return (int(np.searchsorted(sorted_values, low, side='left')),
+                int(np.searchsorted(sorted_values, high, side='right')))
+
+    def _constraints(self, state):
+        """Active constraints as ``(kind, name, payload, matching_rows)``; full-table ones are dropped."""
+        constraints = []
+        for name, selected in state.categories().items():
+            keys = [key for key in self._bits[name] if key in selected]
+            count = sum(len(self._positions[name][key]) for key in keys)
+            if count < self.n_rows:
+                constraints.append(('category', name, keys, count))
+        for name, (low, high) in state.ranges().items():
+            start, stop = self._range_bounds(name, low, high)
+            if stop - start < self.n_rows:
+                constraints.append(('range', name, (low, high, start, stop), stop - start))
+        if state.family_only:
+            constraints.append(('family', None, None, len(self._family_positions)))
+        return constraints
+
+    def _candidates(self, kind, name, payload):
+        if kind == 'category':
+            if len(payload) == 1:
+                return self._positions[name][payload[0]]
+            return np.sort(np.concatenate([self._positions[name][key] for key in payload]))
+        if kind == 'range':
+            return np.sort(self._order[name][payload[2]:payload[3]])
+        return self._family_positions
+
+    def _keep(self, kind, name, payload, positions):
+        if kind == 'category':
+            keep = np.zeros(len(positions), dtype=bool)
+            for key in payload:
+                keep |= _test_bits(self._bits[name][key], positions)
+            return keep
+        if kind == 'range':
+            values = self._data.values(name, positions)
+            return (values >= payload[0]) & (values <= payload[1])
+        return _test_bits(self._family_bits, positions)
+
+    def _scan(self, constraints):
+        bits = np.full((self.n_rows + 7) // 8, 0xFF, dtype=np.uint8)
+        ranges = []
+        for kind, name, payload, _ in constraints:
+            if kind == 'category':
+                combined = np.zeros_like(bits)
+                for key in payload:
+                    combined |= self._bits[name][key]
+                bits &= combined
+            elif kind == 'family':
+                bits &= self._family_bits
+            else:
+                ranges.append((name, payload))
+        mask = np.unpackbits(bits, count=self.n_rows).view(bool)
+        for name, (low, high, start, stop) in ranges:
+            # Wide ranges clear the few rows outside them instead of comparing every row.
+            if self.n_rows - (stop - start) < stop - start:
+                order = self._order[name]
+                mask[order[:start]] = False
+                mask[order[stop:]] = False
+            else:
+                mask &= self._data.between(name, low, high)
+        return np.flatnonzero(mask)
+
+    def select(self, state):
+        """Selection vector (sorted row positions) for ``state``, or ``None`` when every row matches."""
+        constraints = self._constraints(state)
+        if not constraints:
+            return None
+        constraints.sort(key=lambda c: c[3])
+        kind, name, payload, count = constraints[0]
+        if count == 0:
+            return np.empty(0, dtype=np.int32)
+
+        if count > SCAN_RATIO * self.n_rows:
+            positions = self._scan(constraints)
+        else:
+            # Drive from the most selective constraint and probe the rest on its candidates only.
+            positions = self._candidates(kind, name, payload)
+            for kind, name, payload, _ in constraints[1:]:
+                positions = positions[self._keep(kind, name, payload, positions)]
+        return positions.astype(np.int32 if self.n_rows < 2**31 else np.int64)
+
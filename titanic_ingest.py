@@ -0,0 +1,230 @@
+"""Streaming ingestion of uploaded passenger CSVs.
+
+Streamlit keeps an upload in memory, so the file is cut into blocks of
+whole lines that are zero-copy slices of that buffer, and each block is
+parsed by Arrow's CSV reader on its own (Arrow's streaming reader would
+copy the whole file in first). Text columns become dictionary arrays, never
+pandas object columns, and beyond the upload itself memory holds about one
+parsed block whatever the size of the file. Every block is checked
+against the expected schema, narrowed to the smallest dtypes that hold its
+values (the rules of ``optimize_dtypes``) and appended to a Parquet file in
+the cache directory, while a ``StatsBuilder`` accumulates the statistics
+catalog alongside, so loading the result never rescans it for the catalog.
+
+Files are named after the upload's content digest: uploading the same
+extract again, from any session, reuses the Parquet file, which a backend
+then loads like any other source. With the pandas backend configured, an
+upload of more than ``TITANIC_UPLOAD_MEMORY_ROWS`` rows is served by the
+DuckDB backend instead (when installed), which queries the Parquet file
+in place: loading it whole into memory would undo the bounded footprint
+of ingestion.
+"""
+import csv
+import hashlib
+import importlib.util
+import os
+import threading
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from titanic_data import CACHE_DIR, source_signature
+from titanic_stats import StatsBuilder, load_catalog, stats_path_for
+
+
+UPLOAD_DIR = CACHE_DIR / "uploads"
+INGEST_BLOCK_BYTES = int(os.environ.get("TITANIC_INGEST_BLOCK_BYTES", 16 << 20))
+UPLOAD_MEMORY_ROWS = int(os.environ.get("TITANIC_UPLOAD_MEMORY_ROWS", 5_000_000))
+
+# How each expected column is parsed; integer columns are narrowed per block afterwards.
+TEXT = pa.dictionary(pa.int32(), pa.string())
+EXPECTED_SCHEMA = {
+    'Survived': pa.int64(), 'Pclass': pa.int64(), 'Sex': TEXT, 'Age': pa.float64(),
+    'SibSp': pa.int64(), 'Parch': pa.int64(), 'Fare': pa.float64(), 'Embarked': TEXT,
+}
+INTEGER_TYPES = (pa.int8(), pa.int16(), pa.int32(), pa.int64())
+
+
+def upload_path(digest):
+    return UPLOAD_DIR / f"{digest}.parquet"
+
+
+def upload_backend(rows, backend='pandas'):
+    """Backend serving an ingested upload of ``rows`` rows when ``backend`` is the configured one."""
+    if backend == 'pandas' and rows > UPLOAD_MEMORY_ROWS and importlib.util.find_spec('duckdb') is not None:
+        return 'duckdb'
+    return backend
+
+
+def _tmp_path(path, suffix):
+    # Sessions are threads of one process, so the pid alone does not make the name unique.
+    return path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.{suffix}")
+
+
+# ---------------------- Blocks ----------------------
+def _narrowest_integer(low, high):
+    for type_ in INTEGER_TYPES:
+        info = type_.bit_width - 1
+        if -2 ** info <= low and high < 2 ** info:
+            return type_
+    return pa.int64()
+
+
+def compact_batch(batch, first_row=0):
+    """``batch`` checked against the expected schema and narrowed: integers to the smallest width,
+    floats to float32. ``first_row`` only numbers the rows in error messages."""
+    columns = []
+    for name in EXPECTED_SCHEMA:
+        column = batch.column(name)
+        if pa.types.is_integer(column.type):
+            if column.null_count:
+                row = first_row + pc.index(pc.is_null(column), True).as_py()
+                raise ValueError(f"{name} is missing on row {row + 1:,}")
+            if len(column):
+                extent = pc.min_max(column)
+                low, high = extent['min'].as_py(), extent['max'].as_py()
+                if name == 'Survived' and (low < 0 or high > 1):
+                    raise ValueError(f"Survived must be 0 or 1 (found values from {low} to {high})")
+                column = column.cast(_narrowest_integer(low, high))
+        elif pa.types.is_floating(column.type):
+            column = column.cast(pa.float32())
+        columns.append(column)
+    return pa.RecordBatch.from_arrays(columns, names=list(EXPECTED_SCHEMA))
+
+
+def _widen(schema, other):
+    """The schema holding both ``schema`` and ``other`` (they differ only in integer widths)."""
+    fields = []
+    for field, other_field in zip(schema, other):
+        if pa.types.is_integer(field.type) and other_field.type.bit_width > field.type.bit_width:
+            field = other_field
+        fields.append(field)
+    return pa.schema(fields)
+
+
+# ---------------------- Ingestion ----------------------
+def header_names(data):
+    """Column names on the first line of the CSV bytes ``data``."""
+    header = bytes(data[:_line_end(data, 0)])
+    return next(csv.reader([header.decode('utf-8-sig')]), [])
+
+
+def missing_columns(names):
+    return [name for name in EXPECTED_SCHEMA if name not in names]
+
+
+def _line_end(data, start):
+    """Offset just past the first newline at or after ``start`` (the end of ``data`` when there is none)."""
+    view = np.frombuffer(data, dtype=np.uint8)
+    step = 1 << 16
+    while start < len(view):
+        found = np.flatnonzero(view[start:start + step] == 0x0A)
+        if len(found):
+            return start + int(found[0]) + 1
+        start += step
+    return len(view)
+
+
+def _blocks(data, block_bytes):
+    """``(first_row, end, buffer)`` per block of about ``block_bytes``: zero-copy slices of whole lines
+    after the header, ``end`` being the offset the block stops at."""
+    buffer = pa.py_buffer(data)
+    start, first_row = _line_end(data, 0), 0
+    while start < len(buffer):
+        end = _line_end(data, min(start + block_bytes, len(buffer)) - 1)
+        block = buffer.slice(start, end - start)
+        yield first_row, end, block
+        first_row += int(np.count_nonzero(np.frombuffer(block, dtype=np.uint8) == 0x0A))
+        start = end
+
+
+def _parse(block, names, first_row):
+    """One block as an Arrow table of the expected columns; parse errors become ``ValueError``."""
+    try:
+        return pa_csv.read_csv(
+            pa.BufferReader(block), read_options=pa_csv.ReadOptions(column_names=names),
+            # Blank text cells are missing values, as ``pd.read_csv`` reads them, not an empty category.
+            convert_options=pa_csv.ConvertOptions(column_types=EXPECTED_SCHEMA,
+                                                  include_columns=list(EXPECTED_SCHEMA),
+                                                  strings_can_be_null=True, quoted_strings_can_be_null=True))
+    except pa.ArrowInvalid as e:
+        # Arrow counts rows within the block.
+        raise ValueError(f"{e} (in the block starting at data row {first_row + 1:,})") from None
+
+
+def ingest_csv(data, path, progress=None, backend='pandas', block_bytes=INGEST_BLOCK_BYTES):
+    """Ingest the CSV bytes ``data`` (any buffer) into the Parquet file ``path``; returns the row count.
+
+    ``progress(fraction, rows)`` is called after every block when given.
+    The catalog is stored next to the other caches for the backend that
+    serves the file (``upload_backend``). Raises
+    ``ValueError`` on a schema or value error, leaving nothing behind.
+    """
+    names = header_names(data)
+    missing = missing_columns(names)
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    stats = StatsBuilder()
+    # A block needing wider integers than the file so far starts a new part; parts are merged at the end.
+    parts, writer, schema = [], None, None
+    try:
+        for first_row, end, block in _blocks(data, block_bytes):
+            # One batch (and one Parquet row group) per block.
+            for batch in _parse(block, names, first_row).combine_chunks().to_batches():
+                batch = compact_batch(batch, stats.rows)
+                stats.add(batch.to_pandas())
+                widened = batch.schema if schema is None else _widen(schema, batch.schema)
+                if widened != schema:
+                    if writer is not None:
+                        writer.close()
+                    schema = widened
+                    parts.append(_tmp_path(path, f"part{len(parts)}"))
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    writer = pq.ParquetWriter(parts[-1], schema)
+                writer.write_table(pa.Table.from_batches([batch]).cast(schema))
+            if progress is not None:
+                progress(end / len(data), stats.rows)
+        if writer is None:
+            raise ValueError("The file has no passenger rows")
+        writer.close()
+        writer = None
+        _merge(parts, schema, path)
+    finally:
+        if writer is not None:
+            writer.close()
+        for part in parts:
+            part.unlink(missing_ok=True)
+
+    load_catalog(stats_path_for(path, upload_backend(stats.rows, backend)), source_signature(path), stats.result)
+    return stats.rows
+
+
+def _merge(parts, schema, path):
+    """Move a single part into place, or rewrite several into one file with the widest schema."""
+    if len(parts) == 1:
+        os.replace(parts[0], path)
+        return
+    tmp_path = _tmp_path(path, "tmp")
+    try:
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            for part in parts:
+                for batch in pq.ParquetFile(part).iter_batches():
+                    writer.write_table(pa.Table.from_batches([batch]).cast(schema))
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def ingest_upload(upload, progress=None, backend='pandas'):
+    """``(path, backend)`` of the Parquet file for an uploaded CSV (a Streamlit ``UploadedFile``),
+    ingesting it if new, and of the backend that serves it."""
+    data = upload.getbuffer()
+    path = upload_path(hashlib.sha256(data).hexdigest()[:24])
+    if path.exists():
+        rows = pq.ParquetFile(path).metadata.num_rows
+    else:
+        rows = ingest_csv(data, path, progress, backend)
+    return path, upload_backend(rows, backend)
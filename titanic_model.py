@@ -0,0 +1,185 @@
+"""Survival model behind the Survival Probability estimator.
+
+A logistic regression over Pclass, Sex, Age, SibSp, Parch, Fare and
+Embarked, fitted with iteratively reweighted least squares (a handful of
+Newton steps in numpy) once per dataset version. The coefficients are
+persisted as JSON next to the columnar cache
+(``.cache/<stem>.<backend>.model.json``, tagged with the source signature),
+so a restart loads them instead of refitting. When rows are appended to
+the source the refit starts from the previous coefficients, which usually
+converges in a step or two.
+
+Scoring is a single matrix-vector product over the encoded features:
+the estimator's one passenger and an uploaded CSV of millions go through
+the same ``SurvivalModel.score``, and ``score_csv`` streams the file
+through Arrow's CSV reader and writer a block at a time.
+"""
+import io
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from titanic_data import CACHE_DIR
+
+
+# Bump whenever the features or the fit below change so stale models are refitted.
+MODEL_VERSION = 1
+
+MODEL_COLUMNS = ('Pclass', 'Sex', 'Age', 'SibSp', 'Parch', 'Fare', 'Embarked')
+# Standardized numeric inputs; Fare is fitted on log(1 + Fare), it is heavily skewed.
+NUMERIC_FEATURES = ('Age', 'SibSp', 'Parch', 'Fare')
+# One indicator per non-reference level (1st class, female and Cherbourg are the baseline).
+INDICATOR_FEATURES = (('Pclass', 2), ('Pclass', 3), ('Sex', 'male'), ('Embarked', 'Q'), ('Embarked', 'S'))
+SCORE_COLUMN = 'Survival_Probability'
+
+# Larger tables are fitted on a uniform sample of this many rows; more adds nothing to 10 coefficients.
+TRAIN_MAX_ROWS = int(os.environ.get("TITANIC_MODEL_TRAIN_ROWS", 1_000_000))
+SCORE_BLOCK_BYTES = int(os.environ.get("TITANIC_SCORE_BLOCK_BYTES", 16 << 20))
+# Fixed so that every block of an upload parses the model inputs alike, whatever the first block held.
+CSV_COLUMN_TYPES = {'Pclass': pa.float64(), 'Sex': pa.string(), 'Age': pa.float64(), 'SibSp': pa.float64(),
+                    'Parch': pa.float64(), 'Fare': pa.float64(), 'Embarked': pa.string()}
+
+# L2 penalty on the non-intercept coefficients; keeps the fit finite when a level separates perfectly.
+RIDGE = 1.0
+MAX_ITERATIONS = 25
+TOLERANCE = 1e-8
+
+
+def model_path_for(path, backend):
+    return CACHE_DIR / f"{Path(path).stem}.{backend}.model.json"
+
+
+def missing_columns(columns):
+    return [name for name in MODEL_COLUMNS if name not in columns]
+
+
+def missing_csv_columns(source):
+    """``MODEL_COLUMNS`` absent from the header of a CSV file object (left rewound)."""
+    header = pd.read_csv(source, nrows=0).columns
+    source.seek(0)
+    return missing_columns(header)
+
+
+def _numeric(frame, name):
+    values = pd.to_numeric(frame[name], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.log1p(values) if name == 'Fare' else values
+
+
+# ---------------------- Model ----------------------
+class SurvivalModel:
+    """Fitted coefficients plus the centring and scaling of the numeric inputs."""
+
+    def __init__(self, params):
+        self.params = params
+        self.coefficients = np.asarray(params['coefficients'], dtype=np.float64)
+        self.means = np.asarray(params['means'], dtype=np.float64)
+        self.scales = np.asarray(params['scales'], dtype=np.float64)
+        self.train_rows = params['train_rows']
+
+    @staticmethod
+    def features(frame, means, scales):
+        """Design matrix of ``frame``: intercept, standardized numerics (missing -> mean), indicators."""
+        X = np.empty((len(frame), 1 + len(NUMERIC_FEATURES) + len(INDICATOR_FEATURES)))
+        X[:, 0] = 1.0
+        for i, name in enumerate(NUMERIC_FEATURES):
+            column = (_numeric(frame, name) - means[i]) / scales[i]
+            X[:, 1 + i] = np.where(np.isnan(column), 0.0, column)
+        offset = 1 + len(NUMERIC_FEATURES)
+        for i, (name, level) in enumerate(INDICATOR_FEATURES):
+            X[:, offset + i] = (frame[name] == level).to_numpy(dtype=np.float64, na_value=0.0)
+        return X
+
+    def score(self, frame):
+        """Survival probability of every row of ``frame`` (which needs the ``MODEL_COLUMNS``)."""
+        return _sigmoid(self.features(frame, self.means, self.scales) @ self.coefficients)
+
+    def score_one(self, sex, pclass, age, sibsp, parch, fare, embarked):
+        frame = pd.DataFrame({'Pclass': [pclass], 'Sex': [sex], 'Age': [age], 'SibSp': [sibsp],
+                              'Parch': [parch], 'Fare': [fare], 'Embarked': [embarked]})
+        return float(self.score(frame)[0])
+
+    def score_csv(self, source, block_bytes=SCORE_BLOCK_BYTES):
+        """A passenger CSV (path or file object) as CSV bytes with the ``SCORE_COLUMN`` appended.
+
+        Read, scored and written one block at a time, so only a block of
+        rows is ever held as a DataFrame.
+        """
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        reader = pa_csv.open_csv(source, read_options=pa_csv.ReadOptions(block_size=block_bytes),
+                                 convert_options=pa_csv.ConvertOptions(column_types=CSV_COLUMN_TYPES))
+        missing = missing_columns(reader.schema.names)
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        schema = reader.schema.append(pa.field(SCORE_COLUMN, pa.float64()))
+        buffer = io.BytesIO()
+        with pa_csv.CSVWriter(buffer, schema) as writer:
+            for batch in reader:
+                scores = self.score(batch.select(list(MODEL_COLUMNS)).to_pandas())
+                writer.write_batch(pa.RecordBatch.from_arrays(batch.columns + [pa.array(scores)], schema=schema))
+        return buffer.getvalue()
+
+
+def _sigmoid(z):
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+# ---------------------- Fitting ----------------------
+def fit_survival_model(frame, start=None):
+    """Parameters of the logistic regression of ``Survived`` on the ``MODEL_COLUMNS`` of ``frame``.
+
+    ``start`` (a previous fit's coefficients) is where the Newton steps begin.
+    """
+    means, scales = [], []
+    for name in NUMERIC_FEATURES:
+        values = _numeric(frame, name)
+        present = values[~np.isnan(values)]
+        if len(present):
+            means.append(float(present.mean()))
+            scales.append(float(present.std()) or 1.0)
+        else:
+            means.append(0.0)
+            scales.append(1.0)
+    X = SurvivalModel.features(frame, means, scales)
+    y = frame['Survived'].to_numpy(dtype=np.float64)
+
+    penalty = np.full(X.shape[1], RIDGE)
+    penalty[0] = 0.0
+    beta = np.zeros(X.shape[1]) if start is None else np.array(start, dtype=np.float64)
+    for _ in range(MAX_ITERATIONS):
+        p = _sigmoid(X @ beta)
+        weights = p * (1.0 - p)
+        hessian = (X.T * weights) @ X + np.diag(penalty)
+        gradient = X.T @ (y - p) - penalty * beta
+        step = np.linalg.solve(hessian, gradient)
+        beta += step
+        if np.abs(step).max() < TOLERANCE:
+            break
+    return {'coefficients': beta.tolist(), 'means': means, 'scales': scales, 'train_rows': len(frame)}
+
+
+def load_model(path, signature, training_frame, start=None):
+    """The model stored at ``path`` for ``signature``, or one fitted on ``training_frame()`` and stored there."""
+    try:
+        stored = json.loads(Path(path).read_text())
+        if stored.get('signature') == signature and stored.get('version') == MODEL_VERSION:
+            return SurvivalModel(stored['params'])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    params = fit_survival_model(training_frame(), start)
+    if signature is not None:
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps({'signature': signature, 'version': MODEL_VERSION, 'params': params}))
+            os.replace(tmp_path, path)
+        except OSError:
+            # Read-only deployments refit the model on each start.
+            tmp_path.unlink(missing_ok=True)
+    return SurvivalModel(params)
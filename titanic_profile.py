@@ -0,0 +1,135 @@
+"""Opt-in per-stage profiling of script runs.
+
+Enabled with ``?debug=1`` in the URL or ``TITANIC_PROFILE=1`` in the
+environment; otherwise every call here is a no-op. Each run (a full script
+run or a fragment rerun) records its stages with wall time, rows in/out
+and payload bytes. The run is shown in a debug panel in the sidebar and
+written to ``TITANIC_PROFILE_PATH`` (default ``.cache/profile.jsonl``): a
+JSON line per run, or, when the path ends in ``.prom``, a Prometheus
+textfile holding the stages of the latest run.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from titanic_data import CACHE_DIR
+
+
+PROFILE_ENV = "TITANIC_PROFILE"
+PROFILE_PATH = Path(os.environ.get("TITANIC_PROFILE_PATH", CACHE_DIR / "profile.jsonl"))
+PROFILER_KEY = 'profiler'
+
+
+def profiling_enabled():
+    if os.environ.get(PROFILE_ENV, "") not in ("", "0"):
+        return True
+    return st.query_params.get('debug') == '1'
+
+
+def is_fragment_run():
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
+
+
+# ---------------------- Profiler ----------------------
+class Profiler:
+    """Stage records of one run; ``stage()`` yields a dict the caller may fill with rows and bytes."""
+
+    def __init__(self, enabled, kind='script'):
+        self.enabled = enabled
+        self.kind = kind
+        self.stages = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        record = {'stage': name, 'ms': None, 'rows_in': rows_in, 'rows_out': None, 'bytes': None}
+        if not self.enabled:
+            yield record
+            return
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['ms'] = (time.perf_counter() - start) * 1000
+            self.stages.append(record)
+
+    def finish(self, **extra):
+        """Write the run to the profile file; returns the run record (``None`` when disabled)."""
+        if not self.enabled:
+            return None
+        run = {'ts': time.time(), 'kind': self.kind,
+               'total_ms': (time.perf_counter() - self.started) * 1000, 'stages': self.stages}
+        run.update(extra)
+        write_run(run)
+        return run
+
+
+def begin_run(kind='script'):
+    """Start profiling this session's current run and make it the one ``current_profiler`` returns."""
+    profiler = Profiler(profiling_enabled(), kind)
+    st.session_state[PROFILER_KEY] = profiler
+    return profiler
+
+
+def current_profiler():
+    return st.session_state.get(PROFILER_KEY) or Profiler(False)
+
+
+# ---------------------- Output ----------------------
+def _prometheus_text(run):
+    lines = []
+    for metric, field, scale in (('titanic_stage_seconds', 'ms', 1e-3), ('titanic_stage_rows_in', 'rows_in', 1),
+                                 ('titanic_stage_rows_out', 'rows_out', 1), ('titanic_stage_bytes', 'bytes', 1)):
+        lines.append(f"# TYPE {metric} gauge")
+        for record in run['stages']:
+            if record[field] is not None:
+                lines.append(f'{metric}{{kind="{run["kind"]}",stage="{record["stage"]}"}} {record[field] * scale:g}')
+    lines.append("# TYPE titanic_run_seconds gauge")
+    lines.append(f'titanic_run_seconds{{kind="{run["kind"]}"}} {run["total_ms"] / 1000:g}')
+    for name, value in run.get('cache', {}).items():
+        lines.append(f"# TYPE titanic_result_cache_{name} gauge")
+        lines.append(f"titanic_result_cache_{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_run(run, path=PROFILE_PATH):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == '.prom':
+            # The textfile collector reads whole files, so replace it atomically.
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(_prometheus_text(run))
+            os.replace(tmp_path, path)
+        else:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(run, default=str) + "\n")
+    except OSError:
+        # Profiling must never break the page.
+        pass
+
+
+def record_event(stage, seconds, **fields):
+    """Write a one-stage run for work done outside a script run (e.g. a deferred download)."""
+    record = {'stage': stage, 'ms': seconds * 1000, 'rows_in': None, 'rows_out': None, 'bytes': None}
+    record.update(fields)
+    write_run({'ts': time.time(), 'kind': stage, 'total_ms': seconds * 1000, 'stages': [record]})
+
+
+# ---------------------- Debug Panel ----------------------
+def render_debug_panel(run, fragment_timings=None):
+    """Sidebar panel with the stages of ``run``; nothing is shown when profiling is off."""
+    if run is None:
+        return
+    with st.sidebar.expander("🛠 Debug: stage timings"):
+        st.caption(f"Full run {run['total_ms']:.1f} ms · written to {PROFILE_PATH}")
+        st.dataframe(run['stages'], hide_index=True, use_container_width=True)
+        if fragment_timings:
+            st.caption("Section runs (ms)")
+            st.dataframe([{'fragment': name, **entry} for name, entry in fragment_timings.items()],
+                         hide_index=True, use_container_width=True)
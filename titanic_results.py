@@ -0,0 +1,150 @@
+"""Cross-session cache of computed views.
+
+Results are keyed by the canonical view signature: the ``FilterState``
+(sorted category sets, Age/Fare ranges, family flag) plus the selected
+plot. The cache is a bounded LRU with a time-to-live, shared by every
+session of the server process, and counts hits, misses, evictions and
+expirations.
+
+``PopularViews`` tallies which signatures are requested and persists the
+tally next to the Parquet cache, so a restarted server can precompute the
+most popular views before anyone asks for them.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import asdict
+
+from titanic_data import CACHE_DIR
+from titanic_index import FilterState
+
+
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("TITANIC_RESULT_CACHE_ENTRIES", 256))
+RESULT_CACHE_TTL_SECONDS = float(os.environ.get("TITANIC_RESULT_CACHE_TTL", 3600))
+WARM_UP_VIEWS = int(os.environ.get("TITANIC_WARM_UP_VIEWS", 8))
+
+POPULAR_VIEWS_PATH = CACHE_DIR / "popular_views.json"
+# Persist the tally after this many new requests rather than on every rerun.
+POPULAR_VIEWS_FLUSH_EVERY = 20
+
+
+def view_key(filters, plot_type=None):
+    """Canonical signature of a view; ``plot_type=None`` names the filter-level aggregates."""
+    return (filters, plot_type)
+
+
+# ---------------------- Result Cache ----------------------
+class ResultCache:
+    """Thread-safe LRU cache whose entries also expire ``ttl`` seconds after being stored."""
+
+    def __init__(self, max_entries=RESULT_CACHE_MAX_ENTRIES, ttl=RESULT_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Cached value for ``key``, computing and storing it on a miss (outside the lock)."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+# ---------------------- Popular Views ----------------------
+def _encode_view(filters, plot_type):
+    return json.dumps({'filters': asdict(filters), 'plot_type': plot_type}, sort_keys=True)
+
+
+def _decode_view(text):
+    view = json.loads(text)
+    return FilterState.create(**view['filters']), view['plot_type']
+
+
+class PopularViews:
+    """Request counts per ``(filters, plot_type)``, persisted as JSON under the cache directory."""
+
+    def __init__(self, path=POPULAR_VIEWS_PATH):
+        self.path = path
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._pending = 0
+        try:
+            self._counts.update(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            pass
+
+    def record(self, filters, plot_type):
+        with self._lock:
+            self._counts[_encode_view(filters, plot_type)] += 1
+            self._pending += 1
+            flush = self._pending >= POPULAR_VIEWS_FLUSH_EVERY
+        if flush:
+            self.flush()
+
+    def most_common(self, n=WARM_UP_VIEWS):
+        with self._lock:
+            top = self._counts.most_common(n)
+        views = []
+        for text, _ in top:
+            try:
+                views.append(_decode_view(text))
+            except (KeyError, TypeError, ValueError):
+                # Written by an older layout of FilterState; it just won't be warmed.
+                continue
+        return views
+
+    def flush(self):
+        with self._lock:
+            payload = json.dumps(dict(self._counts))
+            self._pending = 0
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(payload)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
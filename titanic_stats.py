@@ -0,0 +1,268 @@
+"""Statistics catalog of the passenger table.
+
+Computed once per dataset version and persisted as JSON next to the
+columnar cache (``.cache/<stem>.<backend>.stats.json``, tagged with the
+source signature), so neither a restart nor a rerun scans the table to set
+up the page. For every catalogued column it keeps the row and null counts;
+categorical columns add their distinct values with counts (in display
+order), numeric ones their min/max, a few quantiles and a small equi-depth
+histogram.
+
+The sidebar takes its choices and slider bounds from the catalog, and the
+DuckDB backend drops filters that ``covers`` shows cannot exclude any row
+from its ``WHERE`` clause. The pandas backend's ``FilterIndex`` plans on
+its own exact per-filter counts, which cost no more than an estimate.
+
+``StatsBuilder`` accumulates the same contents a chunk of rows at a time,
+for data that is streamed in rather than loaded whole (uploads), and
+``merge_stats`` folds the catalog of appended rows into an existing one.
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from titanic_data import CACHE_DIR
+
+
+# Bump whenever the layout below changes so stale catalogs are rebuilt.
+STATS_VERSION = 1
+
+CATEGORY_STATS = ('Sex', 'Pclass', 'Embarked', 'Survived')
+NUMERIC_STATS = ('Age', 'Fare', 'SibSp', 'Parch')
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+HISTOGRAM_BUCKETS = 16
+# Values per numeric column a StatsBuilder keeps to estimate quantiles (exact up to this many rows).
+QUANTILE_SAMPLE_ROWS = 100_000
+
+
+def stats_path_for(path, backend):
+    return CACHE_DIR / f"{Path(path).stem}.{backend}.stats.json"
+
+
+def histogram_quantiles():
+    """Quantile levels of the equi-depth bucket edges (``HISTOGRAM_BUCKETS + 1`` of them, 0 to 1)."""
+    return np.linspace(0, 1, HISTOGRAM_BUCKETS + 1).tolist()
+
+
+def numeric_stats(nulls, quantiles):
+    """Catalog entry from the null count and the values at ``QUANTILES`` followed by ``histogram_quantiles()``."""
+    quantiles = [None if q is None or np.isnan(q) else float(q) for q in quantiles]
+    stats, edges = quantiles[:len(QUANTILES)], quantiles[len(QUANTILES):]
+    return {
+        'nulls': int(nulls),
+        'min': edges[0],
+        'max': edges[-1],
+        'quantiles': dict(zip(map(str, QUANTILES), stats)),
+        'histogram': edges if edges[0] is not None else [],
+    }
+
+
+# ---------------------- Catalog ----------------------
+class StatsCatalog:
+    """Read side of the catalog: lookups for the widgets and the filters a backend can skip."""
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.rows = stats['rows']
+        self.family_rows = stats['family_rows']
+        self._columns = stats['columns']
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def categories(self, name):
+        return [value for value, _ in self._columns[name]['values']]
+
+    def bounds(self, name):
+        column = self._columns[name]
+        return _as_float(column['min']), _as_float(column['max'])
+
+    def covers(self, name, selection):
+        """Whether filtering ``name`` on ``selection`` (values, or an inclusive range) keeps every row."""
+        column = self._columns.get(name)
+        if column is None or column['nulls']:
+            return False
+        if 'values' in column:
+            return set(self.categories(name)) <= set(selection)
+        low, high = selection
+        return column['min'] is not None and low <= column['min'] and column['max'] <= high
+
+
+def _as_float(value):
+    return float('nan') if value is None else float(value)
+
+
+# ---------------------- Building ----------------------
+def dataset_stats(data):
+    """Catalog contents for a ``SharedDataset`` (the pandas backend), in one pass per column."""
+    columns = {}
+    for name in CATEGORY_STATS:
+        if name not in data.columns:
+            continue
+        values = data.values(name)
+        if data.is_categorical(name):
+            counts = np.bincount(values[values >= 0], minlength=len(data.categories(name)))
+            columns[name] = {'nulls': int((values < 0).sum()),
+                             'values': [[value, int(count)] for value, count in zip(data.categories(name), counts)]}
+        else:
+            present = values[~np.isnan(values)] if values.dtype.kind == 'f' else values
+            distinct, counts = np.unique(present, return_counts=True)
+            columns[name] = {'nulls': len(values) - len(present),
+                             'values': [[value, count] for value, count in zip(distinct.tolist(), counts.tolist())]}
+    for name in NUMERIC_STATS:
+        if name not in data.columns:
+            continue
+        values = data.values(name).astype(np.float64)
+        present = values[~np.isnan(values)]
+        levels = list(QUANTILES) + histogram_quantiles()
+        quantiles = np.quantile(present, levels).tolist() if len(present) else [None] * len(levels)
+        columns[name] = numeric_stats(len(values) - len(present), quantiles)
+
+    family = (data.values('SibSp') > 0) | (data.values('Parch') > 0)
+    return {'rows': data.n_rows, 'family_rows': int(family.sum()), 'columns': columns}
+
+
+class StatsBuilder:
+    """Catalog contents accumulated over chunks of rows.
+
+    Row, null and category counts and min/max are exact; quantiles come from
+    a uniform sample of ``sample_rows`` values per numeric column.
+    """
+
+    def __init__(self, sample_rows=QUANTILE_SAMPLE_ROWS, seed=0):
+        self.rows = 0
+        self.family_rows = 0
+        self._sample_rows = sample_rows
+        self._rng = np.random.default_rng(seed)
+        self._nulls = {}
+        self._counts = {name: {} for name in CATEGORY_STATS}
+        self._extent = {}
+        # Per numeric column: random keys, their values and the cut-off; the smallest keys form the sample.
+        self._samples = {}
+
+    def add(self, frame):
+        """Fold in a chunk: a DataFrame with the catalogued columns."""
+        self.rows += len(frame)
+        self.family_rows += int(((frame['SibSp'] > 0) | (frame['Parch'] > 0)).sum())
+        for name in CATEGORY_STATS:
+            if name not in frame.columns:
+                continue
+            column = frame[name]
+            self._nulls[name] = self._nulls.get(name, 0) + int(column.isna().sum())
+            counts = self._counts[name]
+            for value, count in column.value_counts(sort=False).items():
+                if count:
+                    value = value.item() if hasattr(value, 'item') else value
+                    counts[value] = counts.get(value, 0) + int(count)
+        for name in NUMERIC_STATS:
+            if name not in frame.columns:
+                continue
+            values = frame[name].to_numpy(dtype=np.float64, na_value=np.nan)
+            present = values[~np.isnan(values)]
+            self._nulls[name] = self._nulls.get(name, 0) + len(values) - len(present)
+            if not len(present):
+                continue
+            low, high = self._extent.get(name, (np.inf, -np.inf))
+            self._extent[name] = (min(low, present.min()), max(high, present.max()))
+            keys, kept, threshold = self._samples.get(name, (np.empty(0), np.empty(0), 1.0))
+            new_keys = self._rng.random(len(present))
+            # Once the sample is full only keys below its largest can enter it.
+            candidates = new_keys < threshold
+            keys = np.concatenate([keys, new_keys[candidates]])
+            kept = np.concatenate([kept, present[candidates]])
+            if len(keys) > self._sample_rows:
+                keep = np.argpartition(keys, self._sample_rows - 1)[:self._sample_rows]
+                keys, kept = keys[keep], kept[keep]
+                threshold = keys.max()
+            self._samples[name] = (keys, kept, threshold)
+
+    def result(self):
+        """The catalog contents, laid out as ``dataset_stats`` returns them."""
+        columns = {}
+        for name, counts in self._counts.items():
+            if name in self._nulls:
+                columns[name] = {'nulls': self._nulls[name],
+                                 'values': [[value, counts[value]] for value in sorted(counts)]}
+        levels = list(QUANTILES) + histogram_quantiles()
+        for name in NUMERIC_STATS:
+            if name not in self._nulls:
+                continue
+            if name in self._samples:
+                quantiles = np.quantile(self._samples[name][1], levels).tolist()
+                # The sample may miss the extremes; the observed ones bound the sliders.
+                quantiles[len(QUANTILES)], quantiles[-1] = self._extent[name]
+            else:
+                quantiles = [None] * len(levels)
+            columns[name] = numeric_stats(self._nulls[name], quantiles)
+        return {'rows': self.rows, 'family_rows': self.family_rows, 'columns': columns}
+
+
+def _cdf_knots(column):
+    """``(levels, values)`` of a column's stored quantiles and histogram edges, in level order."""
+    knots = sorted([(q, column['quantiles'][str(q)]) for q in QUANTILES]
+                   + list(zip(histogram_quantiles(), column['histogram'])))
+    return np.array([q for q, _ in knots]), np.array([value for _, value in knots])
+
+
+def _mixture_quantiles(parts, levels):
+    """Quantiles of a union of row sets, from ``(catalog column, rows)`` of each set."""
+    knots = [(_cdf_knots(column), rows) for column, rows in parts]
+    grid = np.unique(np.concatenate([values for (_, values), _ in knots]))
+    total = sum(rows for _, rows in parts)
+    cdf = sum(rows * np.interp(grid, values, q) for (q, values), rows in knots) / total
+    return np.interp(levels, cdf, grid).tolist()
+
+
+def merge_stats(stats, delta):
+    """Catalog contents of two disjoint row sets together.
+
+    Counts, nulls and extremes combine exactly; quantiles and histogram edges
+    are read off the mixture of the two sets' stored distributions.
+    """
+    columns = {}
+    for name in CATEGORY_STATS:
+        if name in stats['columns'] and name in delta['columns']:
+            old, new = stats['columns'][name], delta['columns'][name]
+            counts = {value: count for value, count in old['values']}
+            for value, count in new['values']:
+                counts[value] = counts.get(value, 0) + count
+            columns[name] = {'nulls': old['nulls'] + new['nulls'],
+                             'values': [[value, counts[value]] for value in sorted(counts)]}
+    levels = list(QUANTILES) + histogram_quantiles()
+    for name in NUMERIC_STATS:
+        if name not in stats['columns'] or name not in delta['columns']:
+            continue
+        sides = [(stats['columns'][name], stats['rows']), (delta['columns'][name], delta['rows'])]
+        parts = [(column, rows - column['nulls']) for column, rows in sides if column['histogram']]
+        quantiles = [None] * len(levels)
+        if parts:
+            quantiles = _mixture_quantiles(parts, levels)
+            quantiles[len(QUANTILES)] = min(column['min'] for column, _ in sides if column['histogram'])
+            quantiles[-1] = max(column['max'] for column, _ in sides if column['histogram'])
+        columns[name] = numeric_stats(sum(column['nulls'] for column, _ in sides), quantiles)
+    return {'rows': stats['rows'] + delta['rows'], 'family_rows': stats['family_rows'] + delta['family_rows'],
+            'columns': columns}
+
+
+def load_catalog(path, signature, compute):
+    """The catalog stored at ``path`` for ``signature``, or ``compute()``'s, which is then stored there."""
+    try:
+        stored = json.loads(Path(path).read_text())
+        if stored.get('signature') == signature and stored.get('version') == STATS_VERSION:
+            return StatsCatalog(stored['stats'])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    stats = compute()
+    if signature is not None:
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps({'signature': signature, 'version': STATS_VERSION, 'stats': stats}))
+            os.replace(tmp_path, path)
+        except OSError:
+            # Read-only deployments recompute the catalog on each start.
+            tmp_path.unlink(missing_ok=True)
+    return StatsCatalog(stats)
@@ -0,0 +1,350 @@
+"""Visualization registry behind the chart selector.
+
+Every panel registers under its selector label together with the heavy
+modules it renders with (Plotly, seaborn/matplotlib). Those modules are
+imported the first time the panel is selected rather than when the app
+starts, so a cold start only pays for Streamlit, pandas and numpy, and a
+session that never opens the heatmap never loads matplotlib.
+"""
+import importlib
+import time
+from dataclasses import dataclass
+
+import streamlit as st
+
+from titanic_approx import finished_within
+from titanic_bootstrap import survival_intervals
+from titanic_charts import SCATTER_MAX_POINTS, correlation_heatmap_png
+from titanic_fragments import rerun_when_done, timed_fragment
+from titanic_model import MODEL_COLUMNS, missing_csv_columns
+from titanic_profile import current_profiler
+from titanic_results import view_key
+from titanic_workers import run_heavy, submit
+
+
+# ---------------------- Color Palettes ----------------------
+COLOR_SCALE = ['#ff7675', '#74b9ff', '#55efc4', '#a29bfe', '#ffeaa7', '#fd79a8']
+SURVIVAL_COLORS = {0: '#ff7675', 1: '#55efc4'}
+GENDER_COLORS = {'male': '#74b9ff', 'female': '#fd79a8'}
+CLASS_COLORS = {1: '#a29bfe', 2: '#74b9ff', 3: '#55efc4'}
+PORT_NAMES = {'C': 'Cherbourg', 'Q': 'Queenstown', 'S': 'Southampton'}
+# Hover of the survival-rate bars: group size and interval bounds, not the error bar offsets.
+BAR_HOVER = {'count': ':,', 'low': ':.1%', 'high': ':.1%', 'error_plus': False, 'error_minus': False}
+INTERVAL_CAPTION = ("Error bars: 95% bootstrap intervals around the observed rate; "
+                    "Wilson score intervals for groups where all or none survived")
+
+
+# ---------------------- Registry ----------------------
+@dataclass(frozen=True)
+class PanelContext:
+    """What a panel renders from: the query backend, the view of the current filters and the filters."""
+    backend: object
+    view: object
+    filters: object
+
+
+class Visualization:
+    """A selectable panel: its label, the modules it needs and the function that draws it.
+
+    Panels registered with ``figures=True`` do not draw: they return the list
+    of Plotly figures to show, which depend only on the filters and so can be
+    cached across sessions; their ``caption``, if any, is shown under them.
+    ``warm(view)`` computes the view results a panel reads, so they can be
+    precomputed without importing its plotting modules.
+    """
+
+    def __init__(self, label, requires, render, figures=False, caption=None, warm=None):
+        self.label = label
+        self.requires = tuple(requires)
+        self.render = render
+        self.figures = figures
+        self.caption = caption
+        self.warm = warm
+        self.import_seconds = None
+
+    def load(self):
+        """Import the declared modules (a no-op once they are in ``sys.modules``)."""
+        if self.import_seconds is None:
+            start = time.perf_counter()
+            for name in self.requires:
+                importlib.import_module(name)
+            self.import_seconds = time.perf_counter() - start
+        return self
+
+
+# Selector order is registration order.
+VISUALIZATIONS = {}
+
+
+def visualization(label, requires=(), figures=False, caption=None, warm=None):
+    """Register the decorated ``render(ctx)`` function under ``label``."""
+    def register(render):
+        VISUALIZATIONS[label] = Visualization(label, requires, render, figures, caption, warm)
+        return render
+    return register
+
+
+def show_figures(figures):
+    if len(figures) == 1:
+        st.plotly_chart(figures[0], use_container_width=True)
+        return
+    for column, fig in zip(st.columns(len(figures)), figures):
+        with column:
+            st.plotly_chart(fig, use_container_width=True)
+
+
+def build_figures(label, ctx, results=None):
+    """Figures of the figure panel ``label``, from ``results`` when given. Does not call Streamlit."""
+    viz = VISUALIZATIONS[label].load()
+    if results is None:
+        return viz.render(ctx)
+    return results.get_or_compute(view_key(ctx.filters, label), lambda: viz.render(ctx))
+
+
+def prefetch_visualization(label, ctx, results=None):
+    """Start building the figures of ``label`` on the worker pool; ``None`` for panels that draw themselves."""
+    viz = VISUALIZATIONS.get(label)
+    if viz is None or not viz.figures:
+        return None
+    return submit(build_figures, label, ctx, results)
+
+
+def render_visualization(label, ctx, results=None, prefetched=None, estimate=None, budget=0.0):
+    """Draw panel ``label``; figure panels are served from ``results`` when given.
+
+    ``prefetched`` is the future from ``prefetch_visualization`` for this label, if one was started.
+    With ``estimate`` (a function returning a ``SampleView`` of the same
+    filters, or ``None`` when the sample is not precise enough), figures not
+    built within ``budget`` seconds are drawn from the sample instead, and
+    the page reruns once the exact ones are ready.
+    """
+    profiler = current_profiler()
+    with profiler.stage('plot imports'):
+        viz = VISUALIZATIONS[label].load()
+    if not viz.figures:
+        viz.render(ctx)
+        return
+
+    approximate = None
+    with profiler.stage('figure build', rows_in=ctx.view.count if profiler.enabled else None) as stage:
+        if estimate is not None:
+            if prefetched is None:
+                prefetched = submit(build_figures, label, ctx, results)
+            sample_view = None if finished_within(prefetched, budget) else estimate()
+            if sample_view is not None:
+                approximate = prefetched
+                figures = viz.render(PanelContext(ctx.backend, sample_view, ctx.filters))
+        if approximate is None:
+            if prefetched is not None:
+                figures = prefetched.result()
+            else:
+                figures = build_figures(label, ctx, results)
+    with profiler.stage('chart render') as stage:
+        show_figures(figures)
+    if viz.caption:
+        st.caption(viz.caption)
+    if approximate is not None:
+        st.caption(f"≈ Estimated from a stratified sample of {sample_view.sampled_rows:,} passengers; "
+                   "the exact chart replaces it when ready")
+        rerun_when_done([approximate])
+    if profiler.enabled:
+        # Measured after the stage so the extra serialization is not counted in its time.
+        import plotly.io as pio
+        stage['bytes'] = sum(len(pio.to_json(fig, validate=False)) for fig in figures)
+
+
+def warm_up(views, context_for):
+    """Precompute the view results the panels of ``views`` (``(filters, plot_type)`` pairs) read.
+
+    ``context_for(filters)`` builds the ``PanelContext`` (from the shared
+    view cache). Figures are left to the first render, so warming up imports
+    no plotting module.
+    """
+    for filters, plot_type in views:
+        viz = VISUALIZATIONS.get(plot_type)
+        if viz is None or viz.warm is None:
+            continue
+        viz.warm(context_for(filters).view)
+
+
+# ---------------------- Cached Renders ----------------------
+# Rendered heatmaps are cached per filter state; max_entries keeps a long-running server bounded.
+@st.cache_data(max_entries=64, show_spinner=False)
+def render_correlation_heatmap(_view, signature, filters):
+    # Matplotlib holds the GIL while drawing, so this goes to the process pool when there is one.
+    return run_heavy(correlation_heatmap_png, _view.correlation())
+
+
+# ---------------------- Panels ----------------------
+@visualization("📈 Survival Rate by Fare", requires=('plotly.express',), figures=True, caption=INTERVAL_CAPTION,
+               warm=lambda view: survival_intervals(view, 'Fare_Bin'))
+def survival_by_fare(ctx):
+    import plotly.express as px
+
+    # Error bars, so small groups no longer look as certain as large ones.
+    fig = px.bar(survival_intervals(ctx.view, 'Fare_Bin'),
+                 x='Fare_Bin', y='Survived', color='Survived',
+                 error_y='error_plus', error_y_minus='error_minus', hover_data=BAR_HOVER,
+                 color_continuous_scale=[SURVIVAL_COLORS[0], SURVIVAL_COLORS[1]])
+    fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_color='white')
+    return [fig]
+
+
+@visualization("👑 Survival by Class & Gender", requires=('plotly.express',), figures=True,
+               caption=INTERVAL_CAPTION, warm=lambda view: survival_intervals(view, 'Pclass', 'Sex'))
+def survival_by_class_gender(ctx):
+    import plotly.express as px
+
+    fig = px.bar(survival_intervals(ctx.view, 'Pclass', 'Sex'),
+                 x='Pclass', y='Survived', color='Sex', barmode='group',
+                 error_y='error_plus', error_y_minus='error_minus', hover_data=BAR_HOVER,
+                 color_discrete_map=GENDER_COLORS)
+    fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_color='white')
+    return [fig]
+
+
+@visualization("📊 Age Distribution by Survival", requires=('plotly.express',), figures=True,
+               warm=lambda view: view.age_histogram())
+def age_distribution(ctx):
+    import plotly.express as px
+
+    # Binned server-side: the figure carries bin centres and counts, not every age.
+    hist, edges = ctx.view.age_histogram()
+    fig = px.bar(hist, x='Age', y='count', color='Survived',
+                 facet_col='Sex', barmode='overlay',
+                 color_discrete_map={str(k): v for k, v in SURVIVAL_COLORS.items()}, opacity=0.8)
+    fig.update_traces(width=float(edges[1] - edges[0]))
+    fig.update_layout(bargap=0, plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_color='white')
+    return [fig]
+
+
+@visualization("📍 Age vs Fare Scatter", requires=('plotly.express', 'plotly.graph_objects'))
+def age_fare_scatter(ctx):
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    view = ctx.view
+    hover_data = ['Sex', 'Embarked']
+    if 'Name' in ctx.backend.columns:
+        hover_data.insert(0, 'Name')
+
+    # Large selections are reduced server-side instead of shipping every point to the browser.
+    scatter_mode = "All points"
+    if view.count > SCATTER_MAX_POINTS:
+        scatter_mode = st.radio("Rendering", ["Sampled points", "Density grid"],
+                                horizontal=True, key='scatter_mode')
+
+    if scatter_mode == "Density grid":
+        age_edges, fare_edges, counts, rate = view.density_grid()
+        fig = go.Figure(go.Heatmap(
+            x=(age_edges[:-1] + age_edges[1:]) / 2,
+            y=(fare_edges[:-1] + fare_edges[1:]) / 2,
+            z=counts.T, customdata=rate.T,
+            colorscale=[[0, '#0f2027'], [0.5, COLOR_SCALE[1]], [1, COLOR_SCALE[2]]],
+            hovertemplate="Age %{x:.0f} · Fare $%{y:.0f}<br>%{z:.0f} passengers"
+                          "<br>Survival %{customdata:.0%}<extra></extra>"))
+        fig.update_layout(xaxis_title='Age', yaxis_title='Fare')
+        st.caption(f"Density of {view.count:,} passengers on a {len(age_edges) - 1}×{len(fare_edges) - 1} grid")
+    else:
+        # Hover columns are gathered for the plotted rows only.
+        df = view.sample(SCATTER_MAX_POINTS, ['Age', 'Fare', 'Survived', 'Pclass'] + hover_data)
+        fig = px.scatter(df, x='Age', y='Fare', color='Survived',
+                         size='Pclass', hover_data=hover_data,
+                         color_discrete_map=SURVIVAL_COLORS, size_max=15,
+                         render_mode='webgl' if scatter_mode == "Sampled points" else 'auto')
+        if scatter_mode == "Sampled points":
+            st.caption(f"Showing a stratified sample of {len(df):,} of {view.count:,} passengers")
+    fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_color='white')
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@visualization("🎭 Passenger Demographics", requires=('plotly.express',), figures=True,
+               warm=lambda view: (view.counts_by('Sex'), view.counts_by('Pclass')))
+def passenger_demographics(ctx):
+    import plotly.express as px
+
+    fig1 = px.pie(ctx.view.counts_by('Sex'), names='Sex', values='count',
+                  color='Sex', color_discrete_map=GENDER_COLORS)
+    fig1.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='white',
+        showlegend=False
+    )
+
+    fig2 = px.pie(ctx.view.counts_by('Pclass'), names='Pclass', values='count',
+                  color='Pclass', color_discrete_map=CLASS_COLORS)
+    fig2.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='white',
+        showlegend=False
+    )
+    return [fig1, fig2]
+
+
+@visualization("📐 Correlation Heatmap", requires=('seaborn', 'matplotlib.figure'),
+               warm=lambda view: view.correlation())
+def correlation_heatmap(ctx):
+    st.image(render_correlation_heatmap(ctx.view, ctx.backend.signature, ctx.filters), use_container_width=True)
+
+
+# The estimator sliders rerun only this panel, not the surrounding visualization section.
+@visualization("🧮 Survival Probability")
+@timed_fragment("estimator")
+def survival_probability(ctx):
+    st.markdown("""
+    <div class="metric-card">
+        <div class="metric-title">SURVIVAL PROBABILITY ESTIMATOR</div>
+        <div style="color: rgba(255,255,255,0.7); font-size: 0.95rem; margin-bottom: 1rem;">
+            Estimate survival probability based on passenger characteristics
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        user_sex = st.selectbox("Gender", ["female", "male"], key='sex')
+        user_age = st.slider("Age", 0, 100, 30, key='age')
+        user_sibsp = st.slider("Siblings / spouses aboard", 0, 8, 0, key='sibsp')
+        user_embarked = st.selectbox("Port of embarkation", list(PORT_NAMES), index=2,
+                                     format_func=PORT_NAMES.get, key='port')
+    with col2:
+        user_pclass = st.selectbox("Passenger Class", [1, 2, 3], key='class')
+        user_fare = st.slider("Fare ($)", 0, 600, 50, key='fare')
+        user_parch = st.slider("Parents / children aboard", 0, 6, 0, key='parch')
+
+    # The backend fits (or reads back) its model once per dataset version and keeps it.
+    with st.spinner("Fitting survival model..."):
+        model = ctx.backend.survival_model()
+    prob = model.score_one(user_sex, user_pclass, user_age, user_sibsp, user_parch, user_fare, user_embarked)
+    st.markdown(f"""
+    <div class="metric-card" style="background: rgba(85, 239, 196, 0.1); border-color: rgba(85, 239, 196, 0.3);">
+        <div class="metric-title">ESTIMATED SURVIVAL PROBABILITY</div>
+        <div class="metric-value">{prob:.1%}</div>
+        <div style="color: rgba(255,255,255,0.6); font-size: 0.9rem;">
+            Logistic model fitted on {model.train_rows:,} passengers
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Batch scoring: the same model over an uploaded list, scored when the download is clicked.
+    upload = st.file_uploader(f"Score a passenger list (CSV with {', '.join(MODEL_COLUMNS)})",
+                              type=['csv'], key='score_upload')
+    if upload is not None:
+        try:
+            missing = missing_csv_columns(upload)
+        except ValueError as e:
+            st.error(f"❌ Could not read {upload.name}: {e}")
+            return
+        if missing:
+            st.error(f"❌ Missing columns: {', '.join(missing)}")
+        else:
+            st.download_button(
+                label="📥 Download Scored Passengers",
+                data=lambda: model.score_csv(upload),
+                file_name=f"{upload.name.rsplit('.', 1)[0]}_scored.csv",
+                mime='text/csv',
+                on_click="ignore",
+                use_container_width=True
+            )
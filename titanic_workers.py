@@ -0,0 +1,73 @@
+"""Bounded worker pools shared by every session.
+
+Parts of a rerun that do not depend on each other -- the metric values and
+the selected chart's figures -- are started on a thread pool as soon as the
+filtered view exists, and each section joins its result where it renders.
+numpy, Arrow and DuckDB release the GIL in their heavy loops, so on a
+multi-core server the pieces overlap instead of running in script order.
+Jobs that hold the GIL throughout (matplotlib rendering) can go to an
+optional process pool instead.
+
+``TITANIC_WORKER_THREADS`` bounds the thread pool (default: the CPU count,
+at most 4; ``0`` runs everything inline). ``TITANIC_WORKER_PROCESSES`` > 0
+enables the process pool.
+"""
+import multiprocessing
+import os
+import sys
+import types
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+import streamlit as st
+
+
+WORKER_THREADS = int(os.environ.get("TITANIC_WORKER_THREADS", min(4, os.cpu_count() or 1)))
+WORKER_PROCESSES = int(os.environ.get("TITANIC_WORKER_PROCESSES", 0))
+
+
+@st.cache_resource(show_spinner=False)
+def thread_pool(max_workers=WORKER_THREADS):
+    return ThreadPoolExecutor(max_workers, thread_name_prefix="titanic-worker")
+
+
+@st.cache_resource(show_spinner=False)
+def process_pool(max_workers=WORKER_PROCESSES):
+    # Spawned rather than forked: the server process already runs threads.
+    pool = ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context('spawn'))
+    # A spawned worker re-imports the parent's __main__, which under `streamlit run` is the page
+    # script: it would run the whole app. Start every worker now, with a bare __main__ in place.
+    main = sys.modules['__main__']
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        for future in [pool.submit(os.getpid) for _ in range(max_workers)]:
+            future.result()
+    finally:
+        sys.modules['__main__'] = main
+    return pool
+
+
+def submit(fn, *args, **kwargs):
+    """Start ``fn(*args, **kwargs)`` on the shared thread pool and return its future.
+
+    ``fn`` runs outside the script thread, so it must not call Streamlit.
+    """
+    if WORKER_THREADS > 0:
+        return thread_pool().submit(fn, *args, **kwargs)
+    return run_inline(fn, *args, **kwargs)
+
+
+def run_inline(fn, *args, **kwargs):
+    """``fn(*args, **kwargs)`` run now, as a finished future: for work too small to hand to the pool."""
+    future = Future()
+    try:
+        future.set_result(fn(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def run_heavy(fn, *args):
+    """``fn(*args)`` in the process pool when enabled (``fn``, arguments and result must pickle), else inline."""
+    if WORKER_PROCESSES <= 0:
+        return fn(*args)
+    return process_pool().submit(fn, *args).result()